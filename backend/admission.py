@@ -0,0 +1,135 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+
+# Tokens that may be in flight across all summarization requests at once
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("ADMISSION_TOKEN_BUDGET", 16000))
+# Requests allowed to wait for capacity before new ones are turned away
+DEFAULT_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", 16))
+# Seconds a queued request waits before it is rejected
+DEFAULT_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", 30))
+# Generation for each chunk costs roughly as much as encoding this many tokens
+CHUNK_OVERHEAD_TOKENS = 400
+# Seconds of busy time over which completed work is averaged for Retry-After
+THROUGHPUT_WINDOW_SECONDS = 60
+# Characters tokenized to estimate the token count of long documents
+ESTIMATE_SAMPLE_CHARS = 20000
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries the HTTP status and Retry-After."""
+    def __init__(self, status, message, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+def estimate_tokens(text, tokenizer, sample_chars=ESTIMATE_SAMPLE_CHARS):
+    """Count tokens exactly for short text, or extrapolate from a leading sample."""
+    if len(text) <= sample_chars:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    sample_tokens = len(tokenizer.encode(text[:sample_chars], add_special_tokens=False))
+    return int(sample_tokens * len(text) / sample_chars)
+
+
+def truncate_to_tokens(text, tokens, total_tokens):
+    """Keep the lead of text, proportionally cut down to about `tokens` tokens."""
+    if total_tokens <= tokens:
+        return text
+    cut = int(len(text) * tokens / total_tokens)
+    # Prefer ending on a sentence boundary within the kept text
+    end = max(text.rfind('.', 0, cut), text.rfind('।', 0, cut))
+    return text[:end + 1] if end > cut // 2 else text[:cut]
+
+
+class AdmissionController:
+    """
+    Admits summarization work against a global in-flight token budget.
+
+    Requests are served first come, first served. A request that does not fit
+    waits in a bounded queue until capacity frees up or its deadline passes.
+    A single request larger than the whole budget is admitted alone.
+    """
+    def __init__(self, token_budget=DEFAULT_TOKEN_BUDGET, max_queue=DEFAULT_MAX_QUEUE,
+                 queue_timeout=DEFAULT_QUEUE_TIMEOUT, chunk_overhead=CHUNK_OVERHEAD_TOKENS):
+        self.token_budget = token_budget
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.chunk_overhead = chunk_overhead
+        self.in_flight = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        # Decayed totals of tokens completed and seconds spent with work in
+        # flight; their ratio is the controller's throughput, for Retry-After
+        self._completed_tokens = 0.0
+        self._busy_seconds = 0.0
+        self._busy_mark = None
+
+    def estimate_cost(self, tokens, chunks):
+        return tokens + chunks * self.chunk_overhead
+
+    def retry_after(self):
+        """Seconds until the work in flight and in the queue should have drained."""
+        pending = self.in_flight + sum(cost for _, cost in self._queue)
+        rate = self._completed_tokens / self._busy_seconds if self._busy_seconds > 0 else 100.0
+        return max(1, min(120, math.ceil(pending / rate)))
+
+    def acquire(self, cost, timeout=None):
+        """
+        Reserve `cost` tokens of capacity, waiting up to `timeout` seconds.
+
+        Args:
+            cost (int): Estimated cost from estimate_cost().
+            timeout (float, optional): Seconds to wait in the queue. Defaults to
+                the controller's queue_timeout; 0 means do not wait.
+
+        Returns:
+            tuple: Ticket to pass to release().
+
+        Raises:
+            AdmissionRejected: 429 if the queue is full, 503 if capacity did not
+                free up before the deadline.
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        cost = min(cost, self.token_budget)
+        ticket = (object(), cost)
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                raise AdmissionRejected(429, "Too many queued requests", self.retry_after())
+            self._queue.append(ticket)
+            deadline = time.monotonic() + timeout
+            try:
+                while self._queue[0] is not ticket or self.in_flight + cost > self.token_budget:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdmissionRejected(503, "Server is at capacity", self.retry_after())
+                    self._cond.wait(remaining)
+            except AdmissionRejected:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+                raise
+            self._queue.popleft()
+            if self.in_flight == 0:
+                # Idle time does not count towards throughput
+                self._busy_mark = time.monotonic()
+            self.in_flight += cost
+            # The next request in line may also fit
+            self._cond.notify_all()
+        return ticket
+
+    def release(self, ticket):
+        _, cost = ticket
+        with self._cond:
+            # Throughput across all requests: tokens completed per second of busy
+            # time, so concurrent requests are not each credited the full interval
+            now = time.monotonic()
+            busy = now - self._busy_mark
+            decay = math.exp(-busy / THROUGHPUT_WINDOW_SECONDS)
+            self._busy_seconds = decay * self._busy_seconds + busy
+            self._completed_tokens = decay * self._completed_tokens + cost
+            self._busy_mark = now
+            self.in_flight -= cost
+            self._cond.notify_all()
@@ -1,94 +1,147 @@
-from flask import Flask, request, jsonify, make_response, send_file
+from flask import Flask, request, jsonify, make_response, send_file, g, Response
 from flask_cors import CORS
-from PyPDF2 import PdfReader
 import tempfile
 import os
-import re
+import math
 import io
 import torch
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.utils import simpleSplit
 import numpy as np
 import pandas as pd
-import nltk
 from deep_translator import GoogleTranslator
-nltk.download('punkt_tab', quiet=True)
-nltk.download('punkt', quiet=True)
+from model_store import ensure_nltk
+ensure_nltk('punkt_tab', 'punkt', 'stopwords')
 from nltk.corpus import stopwords
 from nltk.tokenize import sent_tokenize, word_tokenize
-from langdetect import detect
+from language_detector import detect_language
 from collections import Counter
 import hashlib
-from gtts import gTTS
-from pydub import AudioSegment
 from english_chunker import EnglishTextProcessor
 from hindi_processor import HindiProcessor
 from kannada_processor import KannadaProcessor
+from multilingual_summarizer import MultilingualSummarizer
+from pdf_export import register_fonts, SummaryPdfRenderer
+from speech import synthesize_wav
+import tracing
+import profiling
+from generation_profiles import GENERATION_PROFILES, DEFAULT_PROFILE
+from pdf_ingest import UploadStore, UploadError, extract_pdf, MAX_PART_BYTES
+from admission import AdmissionController, AdmissionRejected, estimate_tokens, truncate_to_tokens
+from dedup import dedupe_text
+from chunk_planner import CALIBRATE_ON_STARTUP, calibrate_processors
 
 # Initialize processors
 english_processor = EnglishTextProcessor()
-hindi_processor = HindiProcessor()
-kannada_processor = KannadaProcessor()
+try:
+    multilingual_summarizer = MultilingualSummarizer()
+except Exception as e:
+    print(f"Multilingual summarizer unavailable, falling back to translation: {str(e)}")
+    multilingual_summarizer = None
+hindi_processor = HindiProcessor(summarizer=multilingual_summarizer, english_processor=english_processor)
+kannada_processor = KannadaProcessor(summarizer=multilingual_summarizer, english_processor=english_processor)
+
+if CALIBRATE_ON_STARTUP:
+    # Measure models without a stored cost model before serving, so timings are not skewed by traffic
+    try:
+        calibrate_processors(english_processor, multilingual_summarizer, quick=True, only_missing=True)
+    except Exception as e:
+        print(f"Chunk size calibration failed, using default chunk sizes: {str(e)}")
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Request-ID', 'Server-Timing', 'X-Profile-ID'])
 app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB limit
 
 # In-memory cache for TTS audio
 tts_cache = {}
 
-# Register fonts for reportlab
-font_dir = os.path.dirname(os.path.abspath(__file__))
-try:
-    font_path = os.path.join(font_dir, 'NotoSans-Regular.ttf')
-    if os.path.exists(font_path):
-        pdfmetrics.registerFont(TTFont('NotoSans', font_path))
-    
-    font_path = os.path.join(font_dir, 'NotoSans-Devanagari-Regular.ttf')
-    if os.path.exists(font_path):
-        pdfmetrics.registerFont(TTFont('NotoSansDevanagari', font_path))
-    
-    font_path = os.path.join(font_dir, 'NotoSans-Kannada-Regular.ttf')
-    if os.path.exists(font_path):
-        pdfmetrics.registerFont(TTFont('NotoSansKannada', font_path))
-except Exception as e:
-    print(f"Font registration error: {str(e)}")
-    pdfmetrics.registerFont(TTFont('NotoSans', 'Helvetica'))
-    pdfmetrics.registerFont(TTFont('NotoSansDevanagari', 'Helvetica'))
-    pdfmetrics.registerFont(TTFont('NotoSansKannada', 'Helvetica'))
+register_fonts()
+# Created after font registration so the renderer sees the registered fonts
+pdf_renderer = SummaryPdfRenderer()
 
 # Language settings
 SUPPORTED_LANGUAGES = {'en': 'English', 'hi': 'Hindi', 'kn': 'Kannada'}
-FONT_MAPPING = {
-    'en': 'NotoSans',
-    'hi': 'NotoSansDevanagari',
-    'kn': 'NotoSansKannada'
-}
-
-def clean_pdf_text(text):
-    text = re.sub(r'<!\[if.*?\]>', '', text, flags=re.DOTALL)
-    text = re.sub(r'<[a-zA-Z]:.*?>', '', text)
-    text = re.sub(r'</[a-zA-Z]:.*?>', '', text)
-    text = re.sub(r'<xml>.*?</xml>', '', text, flags=re.DOTALL)
-    text = re.sub(r'^\s*[\r\n]+', '', text, flags=re.MULTILINE)
-    return ' '.join(text.split())
-
-def clean_summary_text(text, lang='en'):
-    text = re.sub(r'ii+', '', text)
-    text = re.sub(r'“CP\d+” — \d{4}/\d{1,2}/\d{1,2} — \d{1,2}:\d{2} — page \d+ — #\d+', '', text)
-    text = ' '.join(text.split())
-    if lang == 'en':
-        text = re.sub(r'([.!?])\s+', r'\1\n\n', text)
-    elif lang == 'kn':
-        text = re.sub(r'[^\u0C80-\u0CFF\s.!?]', '', text)
-    elif lang == 'hi':
-        text = re.sub(r'[^\u0900-\u097F\s.!?]', '', text)
-    return text.strip()
+
+upload_store = UploadStore()
+
+# Admission control for /summarize
+admission = AdmissionController()
+# Chunk sizes of the translate-then-summarize fallback and of uncalibrated models
+CHUNK_TOKENS = {'en': 1000, 'hi': 550, 'kn': 550}
+DEGRADED_TOKENS = 1000
+
+@app.before_request
+def start_request_trace():
+    # Unrouted paths share one label so probed URLs cannot grow the metric series
+    g.trace, g.trace_token = tracing.start_trace(
+        request.endpoint or 'unmatched',
+        request.headers.get('X-Request-ID')
+    )
+
+@app.after_request
+def finish_request_trace(response):
+    trace = g.pop('trace', None)
+    if trace is None:
+        return response
+    response.headers['X-Request-ID'] = trace.request_id
+    if trace.stages:
+        response.headers['Server-Timing'] = trace.server_timing()
+    if request.endpoint != 'metrics':
+        tracing.log_trace(trace.finish(response.status_code))
+    return response
+
+@app.teardown_request
+def reset_request_trace(exc):
+    token = g.pop('trace_token', None)
+    if token is not None:
+        tracing.end_trace(token)
+
+# Registered after the trace hooks so profiling starts after and stops before them
+@app.before_request
+def start_request_profile():
+    g.profiler = profiling.start_profile(
+        request.endpoint,
+        request.headers.get('X-Profile-Token'),
+        g.trace.request_id
+    )
+
+@app.after_request
+def save_request_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        with tracing.span('profile_save'):
+            metadata = profiler.save(response.status_code)
+        response.headers['X-Profile-ID'] = metadata['profile_id']
+    return response
+
+@app.teardown_request
+def stop_request_profile(exc):
+    # Handlers that raised never reach after_request
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(tracing.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+def is_profile_admin():
+    return profiling.is_admin_token(request.headers.get('X-Profile-Token'))
+
+@app.route('/profiles', methods=['GET'])
+def list_profiles():
+    if not is_profile_admin():
+        return jsonify({'error': 'Profile access requires a valid X-Profile-Token'}), 403
+    return jsonify({'profiles': profiling.list_profiles()})
+
+@app.route('/profiles/<profile_id>/<kind>', methods=['GET'])
+def get_profile(profile_id, kind):
+    if not is_profile_admin():
+        return jsonify({'error': 'Profile access requires a valid X-Profile-Token'}), 403
+    path = profiling.profile_file(profile_id, kind)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(path, mimetype='text/plain', as_attachment=True, download_name=os.path.basename(path))
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'pdf'}
@@ -111,64 +164,208 @@ def process_pdf():
             file.save(tmp.name)
             temp_path = tmp.name
 
-        text = ""
-        reader = PdfReader(temp_path)
+        # Clean each page as it is extracted instead of the concatenated document
+        with tracing.span('pdf_extract'):
+            text, metadata = extract_pdf(temp_path, file.filename)
+        tracing.incr('pages', metadata['pages'])
+        tracing.incr('boilerplate_lines', metadata['boilerplate_lines'])
+
+        os.unlink(temp_path)  # Cleanup temp file
 
-        metadata = {
-            'pages': len(reader.pages),
-            'author': reader.metadata.author if reader.metadata and reader.metadata.author else 'Unknown',
-            'title': reader.metadata.title if reader.metadata and reader.metadata.title else file.filename
-        }
+        return extraction_response(text, metadata)
 
-        for page in reader.pages:
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted + "\n"
+    except Exception as e:
+        return jsonify({'error': f'PDF processing failed: {str(e)}'}), 500
 
-        os.unlink(temp_path)  # Cleanup temp file
+def extraction_response(text, metadata, upload_id=None):
+    with tracing.span('language_detection'):
+        lang = detect_language(text)
+
+    response = {
+        'text': text,
+        'metadata': metadata,
+        'language': lang
+    }
+    if upload_id:
+        response['upload_id'] = upload_id
+    return jsonify(response)
+
+# Chunked, resumable uploads for documents larger than MAX_CONTENT_LENGTH.
+# Create an upload, PUT each part with its SHA-256, then complete it. The
+# extracted text is kept until the upload is deleted or goes stale; post its
+# upload_id to /summarize instead of the text, which may exceed MAX_CONTENT_LENGTH.
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    data = request.get_json(silent=True) or {}
+    filename = data.get('filename', '')
+
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'Invalid file type'}), 400
 
-        text = clean_pdf_text(text)
-        lang = detect(text) if text.strip() else 'en'
+    upload_id = upload_store.create(filename)
+    return jsonify({'upload_id': upload_id, 'max_part_bytes': MAX_PART_BYTES}), 201
 
-        return jsonify({
-            'text': text,
-            'metadata': metadata,
-            'language': lang
-        })
+@app.route('/uploads/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    try:
+        return jsonify(upload_store.status(upload_id))
+    except UploadError as e:
+        return jsonify({'error': e.message}), e.status
+
+@app.route('/uploads/<upload_id>/parts/<int:index>', methods=['PUT'])
+def upload_part(upload_id, index):
+    try:
+        with tracing.span('write_part'):
+            part = upload_store.write_part(
+                upload_id, index, request.stream, request.headers.get('X-Content-SHA256')
+            )
+        return jsonify(part)
+    except UploadError as e:
+        return jsonify({'error': e.message}), e.status
+
+@app.route('/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    data = request.get_json(silent=True) or {}
+    total_parts = data.get('total_parts')
 
+    if not isinstance(total_parts, int) or total_parts < 1:
+        return jsonify({'error': 'total_parts must be a positive integer'}), 400
+
+    try:
+        with tracing.span('pdf_extract'):
+            text, metadata = upload_store.complete(upload_id, total_parts)
+        tracing.incr('pages', metadata['pages'])
+        tracing.incr('boilerplate_lines', metadata['boilerplate_lines'])
+        return extraction_response(text, metadata, upload_id=upload_id)
+    except UploadError as e:
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         return jsonify({'error': f'PDF processing failed: {str(e)}'}), 500
+
+@app.route('/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    try:
+        upload_store.delete(upload_id)
+        return jsonify({'deleted': upload_id})
+    except UploadError as e:
+        return jsonify({'error': e.message}), e.status
     
 @app.route('/summarize', methods=['POST'])
 def summarize():
     data = request.get_json()
     text = data.get('text', '')
-    print("Raw data:", text)
+    upload_id = data.get('upload_id')
     method = data.get('method', 'bart')
+    summary_lang = data.get('summary_lang', '')
+    profile = data.get('profile', DEFAULT_PROFILE)
+
+    # Text of a completed chunked upload, which may be too large to post back
+    if upload_id:
+        if not isinstance(upload_id, str):
+            return jsonify({'error': 'upload_id must be a string'}), 400
+        try:
+            text = upload_store.extracted_text(upload_id)
+        except UploadError as e:
+            return jsonify({'error': e.message}), e.status
     
     if not text:
         return jsonify({'error': 'No text provided'}), 400
+
+    if not isinstance(profile, str) or profile not in GENERATION_PROFILES:
+        return jsonify({'error': f'Unknown generation profile: {profile}'}), 400
         
     try:
-        lang = detect(text) if text.strip() else 'en'
+        # Always detect on the server: the processors trust this value, and a
+        # client-supplied 'language' would route text to the wrong model
+        with tracing.span('language_detection'):
+            lang = detect_language(text)
         lang = lang if lang in SUPPORTED_LANGUAGES else 'en'
         
-        if lang == 'hi':
-            result = hindi_processor.process(text)
-        elif lang == 'kn':
-            result = kannada_processor.process(text)
-        else:  # English
-            result = english_processor.process_text(text)
+        summary_lang = summary_lang if summary_lang in SUPPORTED_LANGUAGES else lang
+        if lang == 'en':
+            summary_lang = 'en'
+
+        # Estimate the cost and wait for capacity before starting any work that
+        # scales with the text; the estimate only tokenizes a bounded sample
+        with tracing.span('admission'):
+            tokens = estimate_tokens(text, cost_tokenizer(lang))
+            chunks = max(1, math.ceil(tokens / planned_chunk_tokens(lang, tokens)))
+            degraded = False
+            can_degrade = bool(data.get('allow_degraded')) and tokens > DEGRADED_TOKENS
+            try:
+                if can_degrade:
+                    # Don't queue: run now, or fall back to summarizing only the lead
+                    ticket = admission.acquire(admission.estimate_cost(tokens, chunks), timeout=0)
+                else:
+                    ticket = admission.acquire(admission.estimate_cost(tokens, chunks))
+            except AdmissionRejected as e:
+                if not can_degrade:
+                    return rejection_response(e)
+                try:
+                    ticket = admission.acquire(admission.estimate_cost(DEGRADED_TOKENS, 1))
+                except AdmissionRejected as e:
+                    return rejection_response(e)
+                text = truncate_to_tokens(text, DEGRADED_TOKENS, tokens)
+                profile = 'fast'
+                degraded = True
+                tracing.incr('degraded')
+        tracing.incr('estimated_tokens', tokens)
+
+        try:
+            # Drop repeated sentences so they are not translated and summarized again
+            with tracing.span('dedup'):
+                text, duplicates = dedupe_text(text)
+            tracing.incr('duplicate_sentences', duplicates)
+
+            if lang == 'hi':
+                result, method, result_lang = hindi_processor.process(
+                    text, summary_lang=summary_lang, lang=lang, profile=profile)
+            elif lang == 'kn':
+                result, method, result_lang = kannada_processor.process(
+                    text, summary_lang=summary_lang, lang=lang, profile=profile)
+            else:  # English
+                result, method, result_lang = english_processor.process_text(text, profile=profile), 'bart', 'en'
+        finally:
+            admission.release(ticket)
         
         return jsonify({
             'summary': result,
             'language': lang,
-            'method': 'mbart' if lang in ['hi', 'kn'] else 'bart'
+            'summary_language': result_lang,
+            'method': method,
+            'degraded': degraded,
+            'generation': {
+                'profile': profile,
+                'decode_steps': g.trace.counters.get('decode_steps', 0),
+                'generate_ms': round(g.trace.stages.get('generate', 0.0) * 1000, 2)
+            }
         })
         
     except Exception as e:
         return jsonify({'error': f'Summarization failed: {str(e)}'}), 500
 
+def planned_chunk_tokens(lang, tokens):
+    """Chunk size the summarizer for lang will pick for a text of this length."""
+    if lang == 'en':
+        return english_processor.planner.plan(tokens)[0]
+    if multilingual_summarizer is not None and multilingual_summarizer.supports(lang):
+        return multilingual_summarizer.planner.plan(tokens)[0]
+    return CHUNK_TOKENS[lang]
+
+def cost_tokenizer(lang):
+    """Tokenizer whose counts match the model that will process lang."""
+    if lang == 'en':
+        return english_processor.tokenizer
+    if multilingual_summarizer is not None and multilingual_summarizer.supports(lang):
+        return multilingual_summarizer.tokenizer
+    return hindi_processor.tokenizer
+
+def rejection_response(error):
+    response = jsonify({'error': error.message, 'retry_after': error.retry_after})
+    response.status_code = error.status
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
 @app.route('/translate', methods=['POST'])
 def translate():
     data = request.get_json()
@@ -190,7 +387,9 @@ def translate():
 
     try:
         translator = GoogleTranslator(source=source_lang, target=target_lang)
-        translated_text = translator.translate(text)
+        with tracing.span('translate'):
+            translated_text = translator.translate(text)
+        tracing.incr('translator_calls')
         
         if not translated_text or not translated_text.strip():
             return jsonify({'error': 'Translation resulted in empty text'}), 500
@@ -214,6 +413,7 @@ def tts():
 
     cache_key = hashlib.md5(f"{text}_{lang}".encode()).hexdigest()
     if cache_key in tts_cache:
+        tracing.incr('cache_hits')
         return send_file(
             io.BytesIO(tts_cache[cache_key]),
             mimetype='audio/wav',
@@ -223,16 +423,9 @@ def tts():
 
     try:
         if lang in ['kn', 'hi']:
-            tts = gTTS(text=text, lang=lang, slow=False)
-            mp3_fp = io.BytesIO()
-            tts.write_to_fp(mp3_fp)
-            mp3_fp.seek(0)
-
-            audio = AudioSegment.from_file(mp3_fp, format="mp3")
-            wav_fp = io.BytesIO()
-            audio.export(wav_fp, format="wav")
-            wav_fp.seek(0)
-            audio_data = wav_fp.read()
+            tracing.incr('cache_misses')
+            with tracing.span('synthesize'):
+                audio_data = synthesize_wav(text, lang)
 
             tts_cache[cache_key] = audio_data
             return send_file(
@@ -257,61 +450,52 @@ def download_summary():
         return jsonify({'error': 'No summary provided'}), 400
 
     try:
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-        margin = 72
-        y_position = height - margin
-        line_height = 14
-        max_width = width - 2 * margin
-
-        font = FONT_MAPPING.get(lang, 'NotoSans')
-        if font not in pdfmetrics.getRegisteredFontNames():
-            font = 'Helvetica'
-
-        c.setFont('Helvetica', 16)
-        c.drawCentredString(width / 2, y_position, "Document Summary")
-        y_position -= 30
-
-        c.setFont('Helvetica', 12)
-        c.drawCentredString(width / 2, y_position, f"Method: {method.upper()} | Language: {SUPPORTED_LANGUAGES.get(lang, 'Unknown')}")
-        y_position -= 30
-
-        c.setFont(font, 12)
-        if isinstance(summary, str):
-            summary = summary.encode('utf-8').decode('utf-8')
-
-        lines = []
-        for paragraph in summary.split('\n'):
-            paragraph_lines = simpleSplit(paragraph, font, 12, max_width)
-            lines.extend(paragraph_lines)
-            lines.append('')
-
-        for line in lines:
-            if not line:
-                y_position -= line_height
-                continue
-            if y_position < margin:
-                c.showPage()
-                c.setFont(font, 12)
-                y_position = height - margin
-            c.drawString(margin, y_position, line)
-            y_position -= line_height
-
-        c.showPage()
-        c.save()
-        buffer.seek(0)
+        with tracing.span('render_pdf'):
+            pdf, cached = pdf_renderer.render(summary, method, lang, SUPPORTED_LANGUAGES.get(lang, 'Unknown'))
+        tracing.incr('cache_hits' if cached else 'cache_misses')
 
-        return send_file(
-            buffer,
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=f'summary_{method}_{lang}.pdf'
-        )
+        return pdf_response(pdf, f'summary_{method}_{lang}.pdf')
     except Exception as e:
         return jsonify({'error': f'PDF generation failed: {str(e)}'}), 500
 
+@app.route('/download-summaries', methods=['POST'])
+def download_summaries():
+    data = request.get_json()
+    summaries = data.get('summaries', [])
+
+    if not summaries or not isinstance(summaries, list):
+        return jsonify({'error': 'No summaries provided'}), 400
+
+    sections = []
+    for i, item in enumerate(summaries):
+        if not isinstance(item, dict) or not item.get('summary'):
+            return jsonify({'error': f'Summary {i + 1} is empty'}), 400
+        lang = item.get('language', 'en')
+        sections.append({
+            'summary': item['summary'],
+            'method': item.get('method', ''),
+            'language': lang,
+            'language_name': SUPPORTED_LANGUAGES.get(lang, 'Unknown'),
+            'title': item.get('title')
+        })
+
+    try:
+        with tracing.span('render_pdf'):
+            pdf = pdf_renderer.render_batch(sections)
+        tracing.incr('sections', len(sections))
+
+        return pdf_response(pdf, 'summaries.pdf')
+    except Exception as e:
+        return jsonify({'error': f'PDF generation failed: {str(e)}'}), 500
+
+def pdf_response(pdf, filename):
+    """Send a rendered PDF as a download; send_file quotes and encodes the filename."""
+    return send_file(
+        io.BytesIO(pdf),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=filename
+    )
+
 if __name__ == '__main__':
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
     app.run(host='0.0.0.0', port=5000, debug=True)
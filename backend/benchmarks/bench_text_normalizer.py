@@ -0,0 +1,79 @@
+"""
+Throughput of text_normalizer against the multi-pass cleaners it replaced.
+
+Usage:
+    python benchmarks/bench_text_normalizer.py [--sizes-mb 1 4 10] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_normalizer import clean_pdf_text, clean_pdf_pages, clean_summary_text
+from corpus import make_pages
+
+
+def legacy_clean_pdf_text(text):
+    text = re.sub(r'<!\[if.*?\]>', '', text, flags=re.DOTALL)
+    text = re.sub(r'<[a-zA-Z]:.*?>', '', text)
+    text = re.sub(r'</[a-zA-Z]:.*?>', '', text)
+    text = re.sub(r'<xml>.*?</xml>', '', text, flags=re.DOTALL)
+    text = re.sub(r'^\s*[\r\n]+', '', text, flags=re.MULTILINE)
+    return ' '.join(text.split())
+
+
+def legacy_clean_summary_text(text, lang='en'):
+    text = re.sub(r'ii+', '', text)
+    text = re.sub(r'“CP\d+” — \d{4}/\d{1,2}/\d{1,2} — \d{1,2}:\d{2} — page \d+ — #\d+', '', text)
+    text = ' '.join(text.split())
+    if lang == 'en':
+        text = re.sub(r'([.!?])\s+', r'\1\n\n', text)
+    elif lang == 'kn':
+        text = re.sub(r'[^ಀ-೿\s.!?]', '', text)
+    elif lang == 'hi':
+        text = re.sub(r'[^ऀ-ॿ\s.!?]', '', text)
+    return text.strip()
+
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes-mb', type=float, nargs='+', default=[1, 4, 10])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<28}{'MB':>6}{'legacy MB/s':>14}{'new MB/s':>12}{'speedup':>10}")
+    for size_mb in args.sizes_mb:
+        for lang in ('en', 'hi', 'kn'):
+            pages = make_pages(lang, size_mb * 1024 * 1024)
+            document = "\n".join(pages)
+            mb = len(document.encode('utf-8')) / (1024 * 1024)
+
+            cases = [
+                ('clean_pdf_text', lambda: legacy_clean_pdf_text(document), lambda: clean_pdf_text(document)),
+                ('clean_pdf_pages', lambda: legacy_clean_pdf_text(document), lambda: clean_pdf_pages(pages)),
+                ('clean_summary_text', lambda: legacy_clean_summary_text(document, lang),
+                 lambda: clean_summary_text(document, lang))
+            ]
+            for name, legacy, new in cases:
+                if name != 'clean_pdf_pages' and legacy() != new():
+                    print(f"warning: {name} output differs from the legacy implementation ({lang})")
+                legacy_time = best_time(legacy, args.repeat)
+                new_time = best_time(new, args.repeat)
+                print(f"{name + ' [' + lang + ']':<28}{mb:>6.1f}{mb / legacy_time:>14.1f}"
+                      f"{mb / new_time:>12.1f}{legacy_time / new_time:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Synthetic documents for the benchmarks, deterministic for a given seed."""
+import random
+
+WORDS = {
+    'en': "the report shows revenue growth across all regions during the quarter".split(),
+    'hi': "रिपोर्ट में सभी क्षेत्रों में राजस्व वृद्धि दिखाई गई है".split(),
+    'kn': "ವರದಿಯು ಎಲ್ಲಾ ಪ್ರದೇಶಗಳಲ್ಲಿ ಆದಾಯದ ಬೆಳವಣಿಗೆಯನ್ನು ತೋರಿಸುತ್ತದೆ".split()
+}
+SENTENCE_END = {'en': '. ', 'hi': '। ', 'kn': '. '}
+MARKUP = [
+    "<o:p></o:p>",
+    "<![if !supportLists]>",
+    "<xml>\n<w:WordDocument>\n</w:WordDocument>\n</xml>",
+    "“CP12” — 2023/4/1 — 10:15 — page 3 — #7",
+    "\n\n   \n"
+]
+
+SIZES = {
+    '1KB': 1024,
+    '10KB': 10 * 1024,
+    '100KB': 100 * 1024,
+    '1MB': 1024 * 1024,
+    '10MB': 10 * 1024 * 1024
+}
+
+
+def make_page(lang, rng, chars=3000, markup_rate=0.05):
+    parts = []
+    size = 0
+    while size < chars:
+        if rng.random() < markup_rate:
+            piece = rng.choice(MARKUP)
+        else:
+            piece = " ".join(rng.choices(WORDS[lang], k=12)) + SENTENCE_END[lang]
+        parts.append(piece)
+        size += len(piece)
+    return "".join(parts)
+
+
+def make_pages(lang, size_bytes, seed=0, markup_rate=0.05):
+    """Pages of raw extracted text totalling at least size_bytes of UTF-8."""
+    rng = random.Random(seed)
+    pages = []
+    total = 0
+    while total < size_bytes:
+        page = make_page(lang, rng, markup_rate=markup_rate)
+        pages.append(page)
+        total += len(page.encode('utf-8'))
+    return pages
+
+
+def make_text(lang, size_bytes, seed=0):
+    """Clean prose of roughly size_bytes of UTF-8, without extraction markup."""
+    text = "".join(make_pages(lang, size_bytes, seed=seed, markup_rate=0.0))
+    return text.encode('utf-8')[:size_bytes].decode('utf-8', errors='ignore')
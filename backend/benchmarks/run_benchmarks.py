@@ -0,0 +1,304 @@
+"""
+End-to-end benchmark of the summarization pipeline on synthetic documents.
+
+Models and network services are replaced by stubs so that the numbers
+measure this code (cleaning, chunking, tokenization, rendering, audio
+conversion) on CPU only. Tokenizers are the real ones and are loaded once.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--stages clean_pdf_text english_chunking]
+        [--sizes 1KB 10KB 100KB 1MB 10MB] [--repeat 5]
+        [--output benchmarks/results.json]
+        [--baseline benchmarks/baseline.json] [--save-baseline] [--tolerance 0.25]
+
+Exits with status 1 when a case is slower than the stored baseline by more
+than the tolerance.
+
+No baseline is committed: timings only compare on the same machine. Before
+changing a stage, record one on the machine that will run the comparison:
+
+    python benchmarks/run_benchmarks.py --save-baseline
+
+then rerun without --save-baseline after the change. Until a baseline
+exists the run only reports its numbers.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import time
+import wave
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+from corpus import SIZES, make_pages, make_text
+
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+
+class StubTranslator:
+    """Stands in for deep_translator.GoogleTranslator; returns its input."""
+    def __init__(self, source='auto', target='en'):
+        self.source = source
+        self.target = target
+
+    def translate(self, text):
+        return text
+
+
+class StubSummarizationPipeline:
+    """Stands in for the transformers summarization pipeline."""
+    def __call__(self, text, **kwargs):
+        if isinstance(text, list):
+            return [{'summary_text': t[:200]} for t in text]
+        return [{'summary_text': text[:200]}]
+
+
+def stub_synthesizer(text, lang, sample_rate=16000, seconds_per_char=0.01):
+    """Stands in for gTTS; returns silent mono WAV as long as reading text would take."""
+    frames = int(len(text) * seconds_per_char * sample_rate)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b'\x00\x00' * frames)
+    return buffer.getvalue(), 'wav'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, math.ceil(pct * len(sorted_values) / 100) - 1)
+    return sorted_values[index]
+
+
+def reset_peak_rss():
+    """Reset the kernel's peak-RSS counter for this process where Linux allows it."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is the lifetime peak (KB on Linux, bytes on macOS)
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+# --- stages -----------------------------------------------------------------
+# Each stage factory returns (max_size_bytes, setup) where setup(size_bytes)
+# prepares inputs and returns a zero-argument callable to time.
+
+def stage_clean_pdf_text():
+    from text_normalizer import clean_pdf_pages
+
+    def setup(size_bytes):
+        pages = make_pages('en', size_bytes)
+        return lambda: clean_pdf_pages(pages)
+    return SIZES['10MB'], setup
+
+
+def stage_dedup():
+    from dedup import dedupe_text, remove_boilerplate_lines
+
+    def setup(size_bytes):
+        pages = make_pages('en', size_bytes)
+        text = make_text('en', size_bytes)
+        return lambda: (remove_boilerplate_lines(pages), dedupe_text(text))
+    return SIZES['10MB'], setup
+
+
+def stage_english_chunking():
+    from model_store import load_tokenizer
+    from english_chunker import EnglishTextProcessor
+    tokenizer = load_tokenizer("facebook/bart-large-cnn")
+    processor = EnglishTextProcessor(tokenizer=tokenizer, summarizer=StubSummarizationPipeline())
+
+    def setup(size_bytes):
+        text = make_text('en', size_bytes)
+        return lambda: processor.process_text(text)
+    return SIZES['10MB'], setup
+
+
+def _indic_stage(lang):
+    from model_store import load_tokenizer
+    from english_chunker import EnglishTextProcessor
+    if lang == 'hi':
+        from hindi_processor import HindiProcessor as Processor
+    else:
+        from kannada_processor import KannadaProcessor as Processor
+    english = EnglishTextProcessor(
+        tokenizer=load_tokenizer("facebook/bart-large-cnn"),
+        summarizer=StubSummarizationPipeline()
+    )
+    processor = Processor(english_processor=english, translator_factory=StubTranslator)
+
+    def setup(size_bytes):
+        text = make_text(lang, size_bytes)
+        return lambda: processor.process_via_translation(text)
+    return SIZES['10MB'], setup
+
+
+def stage_hindi_processor():
+    return _indic_stage('hi')
+
+
+def stage_kannada_processor():
+    return _indic_stage('kn')
+
+
+def stage_download_summary():
+    from pdf_export import register_fonts, SummaryPdfRenderer
+    register_fonts()
+    renderer = SummaryPdfRenderer()
+
+    def setup(size_bytes):
+        summary = make_text('hi', size_bytes).replace('। ', '।\n')
+        # Bypass the document cache so every run measures layout and rendering
+        return lambda: renderer.render(summary, 'mbart', 'hi', 'Hindi', use_cache=False)
+    return SIZES['1MB'], setup
+
+
+def stage_tts():
+    from speech import synthesize_wav
+
+    def setup(size_bytes):
+        text = make_text('kn', size_bytes)
+        return lambda: synthesize_wav(text, 'kn', synthesizer=stub_synthesizer)
+    return SIZES['100KB'], setup
+
+
+STAGES = {
+    'clean_pdf_text': stage_clean_pdf_text,
+    'dedup': stage_dedup,
+    'english_chunking': stage_english_chunking,
+    'hindi_processor': stage_hindi_processor,
+    'kannada_processor': stage_kannada_processor,
+    'download_summary': stage_download_summary,
+    'tts': stage_tts
+}
+
+
+# --- runner -----------------------------------------------------------------
+
+def run_case(func, size_bytes, repeat):
+    func()  # warm-up: lazy imports, tokenizer caches
+    reset_peak_rss()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = percentile(timings, 50)
+    return {
+        'size_bytes': size_bytes,
+        'runs': repeat,
+        'p50_ms': p50 * 1000,
+        'p95_ms': percentile(timings, 95) * 1000,
+        'throughput_mb_s': (size_bytes / (1024 * 1024)) / p50 if p50 else None,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms=1.0):
+    """Return a list of (case, baseline p50, current p50) for regressed cases."""
+    regressions = []
+    for case, current in results.items():
+        previous = baseline.get(case)
+        if not previous:
+            continue
+        limit = previous['p50_ms'] * (1 + tolerance)
+        if current['p50_ms'] > limit and current['p50_ms'] - previous['p50_ms'] > min_delta_ms:
+            regressions.append((case, previous['p50_ms'], current['p50_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(SIZES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed p50 slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = {}
+    skipped = {}
+    print(f"{'case':<32}{'p50 ms':>12}{'p95 ms':>12}{'MB/s':>10}{'peak RSS MB':>14}")
+    for stage_name in args.stages:
+        try:
+            max_size, setup = STAGES[stage_name]()
+        except Exception as e:
+            skipped[stage_name] = str(e)
+            print(f"{stage_name:<32}skipped: {str(e)}")
+            continue
+        for size_name in args.sizes:
+            size_bytes = SIZES[size_name]
+            if size_bytes > max_size:
+                continue
+            case = f"{stage_name}/{size_name}"
+            stats = run_case(setup(size_bytes), size_bytes, args.repeat)
+            results[case] = stats
+            throughput = f"{stats['throughput_mb_s']:.2f}" if stats['throughput_mb_s'] else '-'
+            print(f"{case:<32}{stats['p50_ms']:>12.2f}{stats['p95_ms']:>12.2f}"
+                  f"{throughput:>10}{stats['peak_rss_mb']:>14.1f}")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat
+        },
+        'results': results,
+        'skipped': skipped
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.tolerance)
+    for case, before, after in regressions:
+        print(f"REGRESSION {case}: p50 {before:.2f} ms -> {after:.2f} ms")
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""
+Chunk and batch sizes chosen from a measured cost model of each summarizer.
+
+Calibration times the loaded model on synthetic chunks across input lengths
+and batch sizes, fits a latency model and stores it as JSON next to the
+model store. The processors then pick the chunk and batch size with the
+lowest predicted total latency for each document, within the model's
+context limit. Without a stored model they keep their fixed defaults.
+
+Usage:
+    python chunk_planner.py calibrate [--models english multilingual] [--quick] [--repeats 2]
+    python chunk_planner.py show [--tokens 2000 10000 50000]
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import numpy as np
+from generation_profiles import DEFAULT_PROFILE, generation_kwargs
+from model_store import MODEL_DIR
+
+COST_MODEL_PATH = os.environ.get("CHUNK_COST_MODEL", os.path.join(MODEL_DIR, "chunk_cost_model.json"))
+# Calibrate models that have no stored cost model when the app starts
+CALIBRATE_ON_STARTUP = os.environ.get("CHUNK_CALIBRATE_ON_STARTUP", "0") == "1"
+
+CALIBRATION_LENGTHS = (128, 256, 512, 768, 1000)
+CALIBRATION_BATCH_SIZES = (1, 2, 4, 8)
+QUICK_LENGTHS = (256, 512, 1000)
+QUICK_BATCH_SIZES = (1, 4)
+# Smaller chunks lose too much context for a useful summary
+MIN_CHUNK_TOKENS = 256
+CHUNK_STEP = 64
+# Room for special tokens and language tags the encoder adds
+CONTEXT_MARGIN = 8
+DEFAULT_CONTEXT_LIMIT = 1024
+
+# Source text repeated to build calibration chunks of a given length
+CALIBRATION_TEXT = {
+    'en': (
+        "The quarterly report shows steady revenue growth across all regions. "
+        "Operating costs fell as the new logistics contracts took effect, "
+        "while investment in research continued at last year's pace. "
+    ),
+    'hi': (
+        "शाम के समय, आकाश में बादलों का खेल चल रहा था। सूरज की रोशनी धीरे-धीरे "
+        "घने बादलों के बीच गायब हो रही थी। चंदना अपने घर के पिछवाड़े में अकेली "
+        "बैठी थी, बारिश को देख रही थी और पुरानी यादों को ताजा कर रही थी। "
+    )
+}
+
+FEATURE_NAMES = ['fixed', 'steps', 'steps*batch', 'steps*batch*tokens', 'batch*tokens', 'batch*tokens^2']
+
+
+def _features(tokens, batch, profile):
+    """
+    Terms of the latency model for one generate() call.
+
+    Encoding grows with batch*tokens (feed-forward) and batch*tokens^2
+    (attention). Each decode step has a fixed cost, a per-sequence cost and
+    cross-attention over the input; the number of steps is taken as the
+    profile's max_length for that input length.
+    """
+    steps = generation_kwargs(profile, tokens)['max_length']
+    return [1.0, steps, steps * batch, steps * batch * tokens, batch * tokens, batch * tokens * tokens]
+
+
+def fit_coefficients(samples, profile):
+    """
+    Least-squares fit of the latency model with non-negative coefficients.
+
+    Features with negative weights are dropped one at a time and the rest
+    refitted, so predictions never fall as inputs grow.
+
+    Args:
+        samples (list): (tokens, batch size, seconds) measurements.
+        profile (str): Generation profile the samples were measured with.
+
+    Returns:
+        list: One coefficient per FEATURE_NAMES entry.
+    """
+    X = np.array([_features(tokens, batch, profile) for tokens, batch, _ in samples])
+    y = np.array([seconds for _, _, seconds in samples])
+    # Scale columns to comparable magnitudes before solving
+    scale = np.abs(X).max(axis=0)
+    scale[scale == 0] = 1.0
+    active = list(range(X.shape[1]))
+    coefficients = np.zeros(X.shape[1])
+    while active:
+        solution = np.linalg.lstsq(X[:, active] / scale[active], y, rcond=None)[0]
+        if (solution >= 0).all():
+            coefficients[active] = solution / scale[active]
+            break
+        active.pop(int(np.argmin(solution)))
+    return coefficients.tolist()
+
+
+class CostModel:
+    """Predicted generate() latency of one summarizer by input length and batch size."""
+    def __init__(self, coefficients, context_limit, batch_sizes, profile=DEFAULT_PROFILE,
+                 samples=None, calibrated=None):
+        self.coefficients = list(coefficients)
+        self.context_limit = context_limit
+        self.batch_sizes = tuple(batch_sizes)
+        self.profile = profile
+        self.samples = samples or []
+        self.calibrated = calibrated
+
+    def predict(self, tokens, batch):
+        return float(np.dot(self.coefficients, _features(tokens, batch, self.profile)))
+
+    def document_seconds(self, total_tokens, chunk_tokens, batch):
+        """
+        Predicted time to summarize a document in full chunks of chunk_tokens,
+        plus one shorter final chunk, generated batch chunks at a time.
+        """
+        full, rest = divmod(total_tokens, chunk_tokens)
+        seconds = (full // batch) * self.predict(chunk_tokens, batch)
+        leftover = full % batch
+        if leftover or rest:
+            seconds += self.predict(chunk_tokens if leftover else rest, leftover + (1 if rest else 0))
+        return seconds
+
+    def plan(self, total_tokens):
+        """
+        Chunk size and batch size with the lowest predicted total latency.
+
+        Documents that fit the context limit are summarized in one pass.
+
+        Returns:
+            tuple: (chunk tokens, batch size, predicted seconds).
+        """
+        limit = self.context_limit - CONTEXT_MARGIN
+        if total_tokens <= limit:
+            return limit, 1, self.predict(total_tokens, 1)
+
+        candidates = set(range(MIN_CHUNK_TOKENS, limit + 1, CHUNK_STEP)) | {limit}
+        best = None
+        for chunk_tokens in sorted(candidates):
+            chunks = math.ceil(total_tokens / chunk_tokens)
+            for batch in self.batch_sizes:
+                if batch > chunks:
+                    continue
+                seconds = self.document_seconds(total_tokens, chunk_tokens, batch)
+                if best is None or seconds < best[2]:
+                    best = (chunk_tokens, batch, seconds)
+        return best
+
+    def to_dict(self):
+        return {
+            'features': FEATURE_NAMES,
+            'coefficients': self.coefficients,
+            'context_limit': self.context_limit,
+            'batch_sizes': list(self.batch_sizes),
+            'profile': self.profile,
+            'samples': self.samples,
+            'calibrated': self.calibrated
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['coefficients'],
+            data['context_limit'],
+            data['batch_sizes'],
+            profile=data.get('profile', DEFAULT_PROFILE),
+            samples=data.get('samples'),
+            calibrated=data.get('calibrated')
+        )
+
+
+def load_cost_models(path=COST_MODEL_PATH):
+    """Stored cost models keyed by model name; empty if none were calibrated."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return {name: CostModel.from_dict(entry) for name, entry in data.get('models', {}).items()}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable cost model {path}: {str(e)}")
+        return {}
+
+
+def save_cost_model(model_name, cost_model, path=COST_MODEL_PATH):
+    models = load_cost_models(path)
+    models[model_name] = cost_model
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'models': {name: model.to_dict() for name, model in models.items()}}, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+class ChunkPlanner:
+    """Chunk and batch sizes for one summarizer, from its stored cost model or fixed defaults."""
+    def __init__(self, model_name, default_chunk_tokens, default_batch_size, path=COST_MODEL_PATH):
+        self.model_name = model_name
+        self.default_chunk_tokens = default_chunk_tokens
+        self.default_batch_size = default_batch_size
+        self.cost_model = load_cost_models(path).get(model_name)
+
+    def plan(self, total_tokens):
+        """
+        Returns:
+            tuple: (chunk tokens, batch size) for a document of total_tokens.
+        """
+        if self.cost_model is None:
+            return self.default_chunk_tokens, self.default_batch_size
+        chunk_tokens, batch_size, _ = self.cost_model.plan(total_tokens)
+        return chunk_tokens, batch_size
+
+    @property
+    def context_limit(self):
+        if self.cost_model is None:
+            return self.default_chunk_tokens
+        return self.cost_model.context_limit - CONTEXT_MARGIN
+
+
+def make_chunk(tokenizer, text, tokens):
+    """Text of exactly `tokens` tokens, cut from repetitions of `text`."""
+    ids = tokenizer.encode(text, add_special_tokens=False)
+    ids = (ids * (tokens // len(ids) + 1))[:tokens]
+    return tokenizer.decode(ids, skip_special_tokens=True)
+
+
+def calibrate(run, context_limit, lengths=CALIBRATION_LENGTHS, batch_sizes=CALIBRATION_BATCH_SIZES,
+              repeats=2, profile=DEFAULT_PROFILE):
+    """
+    Time a summarizer across input lengths and batch sizes and fit a cost model.
+
+    Args:
+        run (callable): run(tokens, batch) generates summaries for a batch of
+            `batch` chunks of `tokens` tokens each.
+        context_limit (int): Longest input the model accepts, in tokens.
+        lengths (tuple, optional): Input lengths to measure.
+        batch_sizes (tuple, optional): Batch sizes to measure.
+        repeats (int, optional): Runs per case; the fastest is kept.
+        profile (str, optional): Generation profile to measure.
+
+    Returns:
+        CostModel: The fitted model.
+    """
+    lengths = [n for n in lengths if n <= context_limit - CONTEXT_MARGIN]
+    run(lengths[0], 1)  # warm-up
+    samples = []
+    for tokens in lengths:
+        for batch in batch_sizes:
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run(tokens, batch)
+                timings.append(time.perf_counter() - start)
+            samples.append((tokens, batch, min(timings)))
+            print(f"  {tokens:>5} tokens x {batch}: {min(timings):.2f}s", flush=True)
+    return CostModel(
+        fit_coefficients(samples, profile),
+        context_limit,
+        batch_sizes,
+        profile=profile,
+        samples=samples,
+        calibrated=time.time()
+    )
+
+
+def _context_limit(model):
+    config = getattr(model, 'config', None)
+    return getattr(config, 'max_position_embeddings', None) or DEFAULT_CONTEXT_LIMIT
+
+
+def english_runner(processor, profile=DEFAULT_PROFILE):
+    """Calibration run() and context limit for an EnglishTextProcessor."""
+    def run(tokens, batch):
+        chunk = make_chunk(processor.tokenizer, CALIBRATION_TEXT['en'], tokens)
+        processor.summarize_batch([chunk] * batch, [tokens] * batch, profile=profile, batch_size=batch)
+    return run, _context_limit(getattr(processor.summarizer, 'model', None))
+
+
+def multilingual_runner(summarizer, lang='hi', profile=DEFAULT_PROFILE):
+    """Calibration run() and context limit for a MultilingualSummarizer."""
+    def run(tokens, batch):
+        chunk = make_chunk(summarizer.tokenizer, CALIBRATION_TEXT[lang], tokens)
+        summarizer.summarize_batch([chunk] * batch, lang, [tokens] * batch, profile=profile, batch_size=batch)
+    return run, _context_limit(summarizer.model)
+
+
+def calibrate_processors(english_processor=None, multilingual_summarizer=None, quick=False,
+                         repeats=2, only_missing=False, path=COST_MODEL_PATH):
+    """
+    Calibrate the given summarizers, store their cost models and switch
+    their planners over to them.
+    """
+    lengths = QUICK_LENGTHS if quick else CALIBRATION_LENGTHS
+    batch_sizes = QUICK_BATCH_SIZES if quick else CALIBRATION_BATCH_SIZES
+    targets = []
+    if english_processor is not None:
+        targets.append((english_processor.planner, english_runner(english_processor)))
+    if multilingual_summarizer is not None:
+        targets.append((multilingual_summarizer.planner, multilingual_runner(multilingual_summarizer)))
+
+    for planner, (run, context_limit) in targets:
+        if only_missing and planner.cost_model is not None:
+            continue
+        print(f"Calibrating {planner.model_name} (context limit {context_limit})", flush=True)
+        cost_model = calibrate(run, context_limit, lengths=lengths, batch_sizes=batch_sizes, repeats=repeats)
+        save_cost_model(planner.model_name, cost_model, path)
+        planner.cost_model = cost_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    calibrate_parser = commands.add_parser('calibrate', help="Measure the summarizers and store cost models")
+    calibrate_parser.add_argument('--models', nargs='+', choices=['english', 'multilingual'],
+                                  default=['english', 'multilingual'])
+    calibrate_parser.add_argument('--quick', action='store_true',
+                                  help="Measure fewer lengths and batch sizes")
+    calibrate_parser.add_argument('--repeats', type=int, default=2)
+    show_parser = commands.add_parser('show', help="Print stored cost models and example plans")
+    show_parser.add_argument('--tokens', nargs='+', type=int, default=[2000, 10000, 50000])
+    args = parser.parse_args()
+
+    if args.command == 'calibrate':
+        english = multilingual = None
+        if 'english' in args.models:
+            from english_chunker import EnglishTextProcessor
+            english = EnglishTextProcessor()
+        if 'multilingual' in args.models:
+            from multilingual_summarizer import MultilingualSummarizer
+            multilingual = MultilingualSummarizer()
+        calibrate_processors(english, multilingual, quick=args.quick, repeats=args.repeats)
+        print(f"Cost models written to {COST_MODEL_PATH}")
+        return 0
+
+    models = load_cost_models()
+    if not models:
+        print(f"No cost models in {COST_MODEL_PATH}; run: python chunk_planner.py calibrate")
+    for name, cost_model in models.items():
+        print(f"{name} (context limit {cost_model.context_limit}, profile {cost_model.profile})")
+        for total in args.tokens:
+            chunk_tokens, batch, seconds = cost_model.plan(total)
+            print(f"  {total:>7} tokens: chunks of {chunk_tokens}, batch {batch}, ~{seconds:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,31 +1,31 @@
-import torch
-from transformers import AutoTokenizer, pipeline
+from model_store import ensure_nltk, load_tokenizer, summarization_pipeline
+from chunk_planner import ChunkPlanner
 import nltk
 
-nltk.download('punkt', quiet=True)
-nltk.download('punkt_tab', quiet=True)
+ensure_nltk('punkt', 'punkt_tab')
 
 class EnglishTextProcessor:
     def __init__(self):
-        self.tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-cnn")
-        self.summarizer = pipeline(
-            "summarization", 
-            model="facebook/bart-large-cnn",
-            device=0 if torch.cuda.is_available() else -1
-        )
+        self.tokenizer = load_tokenizer("facebook/bart-large-cnn")
+        self.summarizer = summarization_pipeline("facebook/bart-large-cnn")
+        self.planner = ChunkPlanner("facebook/bart-large-cnn", default_chunk_tokens=1000, default_batch_size=1)
         
     def _split_sentences(self, text):
         """Split English text into sentences"""
         return nltk.sent_tokenize(text)
     
-    def process_text(self, text, max_tokens=1000):
+    def process_text(self, text, max_tokens=None):
         """
         Process English text:
         - Summarize sentence by sentence and append summaries in an array.
+        Sentences longer than max_tokens (default: the model's calibrated
+        context limit, else 1000) are skipped.
         """
         if not text or not isinstance(text, str):
             return "Error: Invalid input text"
             
+        max_tokens = max_tokens or self.planner.context_limit
+
         # Split into sentences
         sentences = self._split_sentences(text)
         
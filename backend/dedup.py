@@ -0,0 +1,236 @@
+import hashlib
+import re
+import zlib
+from collections import Counter
+import numpy as np
+
+# Sentence ends for English, Hindi and Kannada text after clean_pdf_text
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?।])\s+')
+PUNCTUATION_TABLE = str.maketrans('', '', '.,;:!?।"\'“”‘’()[]{}-—–')
+DIGITS_PATTERN = re.compile(r'\d+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Near-duplicate detection uses MinHash over word unigrams and bigrams, with
+# locality-sensitive hashing: signatures are split into LSH_BANDS bands and only
+# sentences sharing a band are compared. With 8 bands of 4 rows, pairs at
+# Jaccard 0.8 become candidates ~98% of the time, pairs at 0.3 under 7%.
+NUM_PERMUTATIONS = 32
+LSH_BANDS = 8
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+JACCARD_THRESHOLD = 0.7
+# Sentences shorter than this are only removed when repeated exactly
+MIN_NEAR_DUP_WORDS = 6
+# Sentences whose signatures are computed together, bounding temporary arrays
+SIGNATURE_BATCH = 4096
+# Signatures kept per LSH bucket; bounds comparisons on repetitive text
+MAX_BUCKET_SIZE = 8
+# Lines at the top and bottom of a page that may be running headers or footers
+EDGE_LINES = 3
+# Header and footer lines up to this many words may carry a page number
+MAX_PAGE_STAMP_WORDS = 6
+
+_rng = np.random.default_rng(20240601)
+PERM_A = _rng.integers(1, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+PERM_B = _rng.integers(0, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def _normalize(sentence):
+    return WHITESPACE_PATTERN.sub(' ', sentence.lower().translate(PUNCTUATION_TABLE)).strip()
+
+
+def _features(words):
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def minhash_signatures(feature_lists):
+    """
+    MinHash signatures for many feature lists at once.
+
+    Each feature is hashed once (CRC-32, so results are the same in every
+    process); the NUM_PERMUTATIONS hash functions are
+    multiply-add permutations applied to all features in one vectorized step,
+    and each list's minimum is taken with a segmented reduction.
+
+    Returns:
+        numpy.ndarray: One row of NUM_PERMUTATIONS uint64 values per list.
+    """
+    lengths = [len(features) for features in feature_lists]
+    hashes = np.fromiter(
+        (zlib.crc32(feature.encode('utf-8')) for features in feature_lists for feature in features),
+        dtype=np.uint64,
+        count=sum(lengths)
+    )
+    permuted = hashes[:, None] * PERM_A + PERM_B
+    offsets = np.concatenate(([0], np.cumsum(lengths[:-1]))).astype(np.intp)
+    return np.minimum.reduceat(permuted, offsets, axis=0)
+
+
+class MinHashIndex:
+    """LSH index of MinHash signatures for near-duplicate lookups."""
+    def __init__(self):
+        self._buckets = {}
+        self._signatures = np.empty((256, NUM_PERMUTATIONS), dtype=np.uint64)
+        self._size = 0
+
+    def _keys(self, signature):
+        return [(band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes())
+                for band in range(LSH_BANDS)]
+
+    def find(self, signature):
+        """Return True if a stored signature is estimated to be a near-duplicate."""
+        candidates = set()
+        for key in self._keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        if not candidates:
+            return False
+        matches = np.count_nonzero(self._signatures[list(candidates)] == signature, axis=1)
+        return matches.max() >= JACCARD_THRESHOLD * NUM_PERMUTATIONS
+
+    def add(self, signature):
+        if self._size == len(self._signatures):
+            self._signatures = np.concatenate((self._signatures, np.empty_like(self._signatures)))
+        position = self._size
+        self._signatures[position] = signature
+        self._size += 1
+        for key in self._keys(signature):
+            bucket = self._buckets.setdefault(key, [])
+            if len(bucket) < MAX_BUCKET_SIZE:
+                bucket.append(position)
+
+
+def dedupe_sentences(sentences):
+    """
+    Drop sentences that repeat an earlier one exactly or nearly (MinHash).
+
+    Returns:
+        tuple: (kept sentences in order, number removed).
+    """
+    seen = set()
+    index = MinHashIndex()
+    kept = []
+    for start in range(0, len(sentences), SIGNATURE_BATCH):
+        batch = []
+        for sentence in sentences[start:start + SIGNATURE_BATCH]:
+            normalized = _normalize(sentence)
+            if not normalized:
+                continue
+            digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            batch.append((sentence, normalized.split()))
+
+        eligible = [words for _, words in batch if len(words) >= MIN_NEAR_DUP_WORDS]
+        signatures = iter(minhash_signatures([_features(words) for words in eligible])) if eligible else None
+        for sentence, words in batch:
+            if len(words) >= MIN_NEAR_DUP_WORDS:
+                signature = next(signatures)
+                if index.find(signature):
+                    continue
+                index.add(signature)
+            kept.append(sentence)
+    return kept, len(sentences) - len(kept)
+
+
+def dedupe_text(text):
+    """
+    Remove repeated sentences from cleaned document text.
+
+    Returns:
+        tuple: (deduplicated text, number of sentences removed).
+    """
+    sentences = SENTENCE_SPLIT_PATTERN.split(text)
+    kept, removed = dedupe_sentences(sentences)
+    if not removed:
+        return text, 0
+    return ' '.join(kept), removed
+
+
+def _edge_lines(lines, edge_lines):
+    """Indexes of the first and last edge_lines non-empty lines of a page."""
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return set(filled[:edge_lines] + filled[-edge_lines:])
+
+
+def _page_number_offset(page_lines, edges, threshold):
+    """
+    Offset between page numbers printed in headers or footers and page
+    indexes, if one is shared by at least threshold pages.
+    """
+    offsets = Counter()
+    for index, (lines, edge) in enumerate(zip(page_lines, edges)):
+        found = set()
+        for i in edge:
+            if len(lines[i].split()) <= MAX_PAGE_STAMP_WORDS:
+                found.update(int(run) - index for run in DIGITS_PATTERN.findall(lines[i])[:4])
+        offsets.update(found)
+    if not offsets:
+        return None
+    offset, count = offsets.most_common(1)[0]
+    return offset if count >= threshold else None
+
+
+def _boilerplate_signature(line, index, offset):
+    # Only the page number is masked, so "Page 3 of 40" matches "Page 4 of 40"
+    # while lines that differ in any other figure stay distinct. The first match
+    # is taken, so the last page's "Page 40 of 40" keeps its total.
+    if offset is not None and len(line.split()) <= MAX_PAGE_STAMP_WORDS:
+        for match in DIGITS_PATTERN.finditer(line):
+            if int(match.group()) == index + offset:
+                line = line[:match.start()] + '#' + line[match.end():]
+                break
+    return _normalize(line)
+
+
+def remove_boilerplate_lines(pages, min_fraction=0.5, min_pages=3, edge_lines=EDGE_LINES):
+    """
+    Drop lines that recur across pages, such as running headers, footers and
+    page stamps. Only the first and last edge_lines lines of a page are
+    candidates. Lines must match exactly apart from a page number that
+    advances with the page. A page is never emptied: if every line of it
+    matches, it is kept whole.
+
+    Args:
+        pages (list): Raw text of each page; None entries are treated as empty.
+        min_fraction (float, optional): Share of pages a line must appear on to
+            count as boilerplate. Defaults to 0.5.
+        min_pages (int, optional): Documents with fewer pages are left alone.
+            Defaults to 3.
+        edge_lines (int, optional): Lines at the top and bottom of each page
+            considered. Defaults to EDGE_LINES.
+
+    Returns:
+        tuple: (list of page texts without boilerplate, number of lines removed).
+    """
+    pages = [page or '' for page in pages]
+    if len(pages) < min_pages:
+        return pages, 0
+
+    threshold = max(2, int(len(pages) * min_fraction))
+    page_lines = [page.splitlines() for page in pages]
+    edges = [_edge_lines(lines, edge_lines) for lines in page_lines]
+    offset = _page_number_offset(page_lines, edges, threshold)
+    candidates = []
+    page_counts = {}
+    for index, (lines, edge) in enumerate(zip(page_lines, edges)):
+        signatures = {i: _boilerplate_signature(lines[i], index, offset) for i in edge}
+        candidates.append(signatures)
+        for key in set(signatures.values()):
+            if key:
+                page_counts[key] = page_counts.get(key, 0) + 1
+
+    boilerplate = {key for key, count in page_counts.items() if count >= threshold}
+    if not boilerplate:
+        return pages, 0
+
+    cleaned = []
+    removed = 0
+    for page, lines, signatures in zip(pages, page_lines, candidates):
+        drop = {i for i, key in signatures.items() if key in boilerplate}
+        kept = [line for i, line in enumerate(lines) if i not in drop]
+        if drop and not any(line.strip() for line in kept):
+            cleaned.append(page)
+            continue
+        removed += len(drop)
+        cleaned.append('\n'.join(kept))
+    return cleaned, removed
@@ -1,14 +1,6 @@
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
-import os
+from model_store import download
 
-model_name = "google/pegasus-x-large"
-model_path = os.path.join(os.path.dirname(__file__), "models", "pegasus-x-large")
-
-# Download model and tokenizer
-model = AutoModelForSeq2SeqLM.from_pretrained(model_name, cache_dir=model_path)
-tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=model_path)
-
-# Save to ensure local availability
-model.save_pretrained(model_path)
-tokenizer.save_pretrained(model_path)
+# Saves Pegasus-X to models/pegasus-x-large as safetensors; see model_store.py
+# to download every model the app uses
+model_path = download("google/pegasus-x-large")
 print(f"Model and tokenizer saved to {model_path}")
\ No newline at end of file
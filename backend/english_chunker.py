@@ -1,49 +1,31 @@
-import torch
-from transformers import AutoTokenizer, pipeline
+from model_store import ensure_nltk, load_tokenizer, summarization_pipeline
 import nltk
-nltk.download('punkt', quiet=True)
-nltk.download('punkt_tab', quiet=True)
+import tracing
+from generation_profiles import DEFAULT_PROFILE, generation_kwargs
+from chunk_planner import ChunkPlanner
+ensure_nltk('punkt', 'punkt_tab')
+
+MODEL_NAME = "facebook/bart-large-cnn"
 
 class EnglishTextProcessor:
-    def __init__(self):
-        self.tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-cnn")
-        self.summarizer = pipeline(
-            "summarization", 
-            model="facebook/bart-large-cnn",
-            device=0 if torch.cuda.is_available() else -1
-        )
+    def __init__(self, tokenizer=None, summarizer=None):
+        self.tokenizer = tokenizer or load_tokenizer(MODEL_NAME)
+        self.summarizer = summarizer or summarization_pipeline(MODEL_NAME)
+        # Chunk and batch sizes from the calibrated cost model, else 1000 tokens one at a time
+        self.planner = ChunkPlanner(MODEL_NAME, default_chunk_tokens=1000, default_batch_size=1)
         
     def _split_sentences(self, text):
         """Split English text into sentences"""
         return nltk.sent_tokenize(text)
     
-    def process_text(self, text, max_tokens=1000):
+    def chunk_text(self, text, max_tokens=1000, with_counts=False):
         """
-        Process English text:
-        - Returns summary if < max_tokens
-        - Otherwise chunks and summarizes separately
+        Split text into sentence-aligned chunks of at most max_tokens tokens.
+        With with_counts=True, also return each chunk's token count.
         """
-        if not text or not isinstance(text, str):
-            return "Error: Invalid input text"
-            
-        # Check token count
-        tokens = len(self.tokenizer.encode(text, add_special_tokens=False))
-        if tokens <= max_tokens:
-            # Process small text directly
-            try:
-                summary = self.summarizer(
-                    text,
-                    max_length=300,
-                    min_length=100,
-                    do_sample=False
-                )[0]['summary_text']
-                return summary
-            except Exception as e:
-                return f"Summarization error: {str(e)}"
-            
-        # Split into sentences for chunking
         sentences = self._split_sentences(text)
         chunks = []
+        counts = []
         current_chunk = []
         current_tokens = 0
         
@@ -52,30 +34,92 @@ class EnglishTextProcessor:
             if current_tokens + sent_tokens > max_tokens:
                 if current_chunk:
                     chunks.append(" ".join(current_chunk))
+                    counts.append(current_tokens)
                     current_chunk = []
                     current_tokens = 0
                 # Add sentence even if it exceeds max_tokens
                 chunks.append(sent)
+                counts.append(sent_tokens)
             else:
                 current_chunk.append(sent)
                 current_tokens += sent_tokens
         
         if current_chunk:
             chunks.append(" ".join(current_chunk))
-            
-        # Summarize each chunk
+            counts.append(current_tokens)
+        return (chunks, counts) if with_counts else chunks
+    
+    def _generate(self, text, input_tokens, profile, single_pass=False):
+        """Summarize one piece of text and record its decode steps"""
+        with tracing.span('generate'):
+            summary = self.summarizer(
+                text,
+                **generation_kwargs(profile, input_tokens, single_pass=single_pass)
+            )[0]['summary_text']
+        tracing.incr('decode_steps', len(self.tokenizer.encode(summary)))
+        return summary
+    
+    def summarize_batch(self, chunks, counts, profile=DEFAULT_PROFILE, batch_size=1):
+        """
+        Summarize chunks batch_size at a time. In each batch the longest chunk
+        sets the length cap and the shortest the minimum. Inputs over the model's
+        limit are truncated; a batch that still fails is retried one chunk at a
+        time, so only the failing chunks are skipped.
+        """
         summaries = []
-        for chunk in chunks:
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i + batch_size]
+            batch_counts = counts[i:i + batch_size]
+            kwargs = generation_kwargs(profile, max(batch_counts))
+            kwargs['min_length'] = generation_kwargs(profile, min(batch_counts))['min_length']
             try:
-                summary = self.summarizer(
-                    chunk,
-                    max_length=150,
-                    min_length=50,
-                    do_sample=False
-                )[0]['summary_text']
-                summaries.append(summary)
+                with tracing.span('generate'):
+                    outputs = self.summarizer(batch, batch_size=len(batch), truncation=True, **kwargs)
             except Exception as e:
+                if len(batch) > 1:
+                    print(f"Batch summarization error, retrying chunks one at a time: {str(e)}")
+                    summaries.extend(self.summarize_batch(batch, batch_counts, profile=profile, batch_size=1))
+                    continue
+                tracing.incr('chunk_errors')
                 print(f"Chunk summarization error: {str(e)}")
                 continue
-                
+            batch_summaries = [output['summary_text'] for output in outputs]
+            tracing.incr('decode_steps', max(len(self.tokenizer.encode(s)) for s in batch_summaries))
+            summaries.extend(batch_summaries)
+        return summaries
+    
+    def process_text(self, text, max_tokens=None, profile=DEFAULT_PROFILE):
+        """
+        Process English text:
+        - Returns summary if it fits in one chunk
+        - Otherwise chunks and summarizes the chunks in batches
+        Chunk and batch sizes come from the planner unless max_tokens is given.
+        Summary lengths and decoding follow the named generation profile.
+        """
+        if not text or not isinstance(text, str):
+            return "Error: Invalid input text"
+            
+        # Check token count
+        with tracing.span('tokenize'):
+            tokens = len(self.tokenizer.encode(text, add_special_tokens=False))
+        tracing.incr('input_tokens', tokens)
+        if max_tokens:
+            batch_size = self.planner.default_batch_size
+        else:
+            max_tokens, batch_size = self.planner.plan(tokens)
+        if tokens <= max_tokens:
+            # Process small text directly
+            tracing.incr('chunks')
+            try:
+                return self._generate(text, tokens, profile, single_pass=True)
+            except Exception as e:
+                return f"Summarization error: {str(e)}"
+            
+        with tracing.span('chunking'):
+            chunks, counts = self.chunk_text(text, max_tokens=max_tokens, with_counts=True)
+        tracing.incr('chunks', len(chunks))
+        tracing.set_attr('chunk_tokens', max_tokens)
+        tracing.set_attr('batch_size', batch_size)
+            
+        summaries = self.summarize_batch(chunks, counts, profile=profile, batch_size=batch_size)
         return " ".join(summaries) if summaries else "Error: No summaries generated"
\ No newline at end of file
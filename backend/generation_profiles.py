@@ -0,0 +1,66 @@
+# Named decoding strategies. Summary length limits scale with the input's token
+# count (min_ratio/max_ratio) and are capped by the limits the pipeline always
+# used: 100-300 tokens for a single-pass summary, 50-150 for each chunk.
+GENERATION_PROFILES = {
+    'fast': {
+        'num_beams': 1,
+        'min_ratio': 0.05,
+        'max_ratio': 0.2,
+        'no_repeat_ngram_size': 3,
+        'length_penalty': 1.0
+    },
+    'balanced': {
+        'num_beams': 2,
+        'min_ratio': 0.1,
+        'max_ratio': 0.3,
+        'no_repeat_ngram_size': 3,
+        'length_penalty': 1.0
+    },
+    'quality': {
+        'num_beams': 4,
+        'min_ratio': 0.15,
+        'max_ratio': 0.4,
+        'no_repeat_ngram_size': 3,
+        'length_penalty': 2.0
+    }
+}
+DEFAULT_PROFILE = 'balanced'
+
+SINGLE_PASS_LIMITS = {'min_cap': 100, 'max_cap': 300}
+CHUNK_LIMITS = {'min_cap': 50, 'max_cap': 150}
+# Shortest summary worth generating, in tokens
+MIN_SUMMARY_TOKENS = 8
+
+
+def generation_kwargs(profile, input_tokens, single_pass=False):
+    """
+    Build generate() arguments for a profile and an input length.
+
+    Args:
+        profile (str): Name of a GENERATION_PROFILES entry.
+        input_tokens (int): Token count of the text being summarized.
+        single_pass (bool, optional): Whether the whole document is summarized
+            at once rather than as one of several chunks. Defaults to False.
+
+    Returns:
+        dict: Keyword arguments for the summarization pipeline or model.generate().
+    """
+    settings = GENERATION_PROFILES[profile]
+    limits = SINGLE_PASS_LIMITS if single_pass else CHUNK_LIMITS
+
+    max_length = int(input_tokens * settings['max_ratio'])
+    max_length = max(MIN_SUMMARY_TOKENS * 2, min(limits['max_cap'], max_length))
+    min_length = int(input_tokens * settings['min_ratio'])
+    min_length = max(MIN_SUMMARY_TOKENS, min(limits['min_cap'], min_length, max_length // 2))
+
+    kwargs = {
+        'max_length': max_length,
+        'min_length': min_length,
+        'num_beams': settings['num_beams'],
+        'no_repeat_ngram_size': settings['no_repeat_ngram_size'],
+        'do_sample': False
+    }
+    if settings['num_beams'] > 1:
+        kwargs['early_stopping'] = True
+        kwargs['length_penalty'] = settings['length_penalty']
+    return kwargs
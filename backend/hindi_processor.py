@@ -1,16 +1,19 @@
-import nltk
-from transformers import AutoTokenizer
+from model_store import ensure_nltk, load_tokenizer
 from deep_translator import GoogleTranslator, MyMemoryTranslator  # Import MyMemoryTranslator
 from english_chunker import EnglishTextProcessor
 from indicnlp.tokenize.sentence_tokenize import sentence_split
-from langdetect import detect
-nltk.download('punkt', quiet=True)
-nltk.download('punkt_tab', quiet=True)
+from language_detector import detect_language
+import tracing
+from generation_profiles import DEFAULT_PROFILE
+ensure_nltk('punkt', 'punkt_tab')
 
 class HindiProcessor:
-    def __init__(self):
-        self.tokenizer = AutoTokenizer.from_pretrained("xlm-roberta-base")
-        self.english_processor = EnglishTextProcessor()
+    def __init__(self, summarizer=None, english_processor=None, translator_factory=GoogleTranslator):
+        self.tokenizer = load_tokenizer("xlm-roberta-base")
+        # Share the heavy models with the other processors when the app passes them in
+        self.english_processor = english_processor or EnglishTextProcessor()
+        self.summarizer = summarizer
+        self.translator_factory = translator_factory
 
     def translate_hindi_to_english(self, text, chunk_size=550):
         """
@@ -28,35 +31,36 @@ class HindiProcessor:
         if not text or not isinstance(text, str) or not text.strip():
             return "Error: Invalid input text. Please provide a string."
 
-        translator = GoogleTranslator(source='hi', target='en')
+        translator = self.translator_factory(source='hi', target='en')
         # translator = MyMemoryTranslator(source='hi', target='en') # Try this
 
         try:
             # Check the length of the input text in terms of tokens
-            input_tokens = len(self.tokenizer.encode(text, add_special_tokens=False))
-            print(f"Hindi input tokens: {input_tokens}")
+            with tracing.span('tokenize'):
+                input_tokens = len(self.tokenizer.encode(text, add_special_tokens=False))
+            tracing.incr('input_tokens', input_tokens)
 
             if input_tokens <= chunk_size:
                 # If the text is short enough, translate it directly
-                print("Translating Hindi to English (single pass)")
-                translated_text = translator.translate(text)
-                print(f"Translated text: {translated_text}") # Debug: Print output
+                with tracing.span('translate'):
+                    translated_text = translator.translate(text)
+                tracing.incr('translator_calls')
                 if not translated_text or not translated_text.strip() or len(translated_text.strip()) < 10:
                     print("Warning: Translated text is too short or empty")
                     return "Error: Translation produced insufficient text."
                 return translated_text
             else:
                 # If the text is too long, split it into sentences and translate each sentence
-                print("Input exceeds 500 tokens, chunking enabled")
                 sentences = sentence_split(text,lang='hi')
                 translated_sentences = []
-                for i, sentence in enumerate(sentences):
-                    print(f"Translating sentence {i+1}/{len(sentences)}")
-                    translated_sentence = translator.translate(sentence)
+                for sentence in sentences:
+                    with tracing.span('translate'):
+                        translated_sentence = translator.translate(sentence)
+                    tracing.incr('translator_calls')
                     if translated_sentence and len(translated_sentence.strip()) >= 5:
                         translated_sentences.append(translated_sentence)
                     else:
-                        print(f"Warning: Translation failed or too short for sentence: {sentence}")
+                        tracing.incr('translation_failures')
                 translated_text = " ".join(translated_sentences)
                 if not translated_text or len(translated_text.strip()) < 20:
                     print("Warning: Combined translated text is too short or empty")
@@ -67,27 +71,70 @@ class HindiProcessor:
             print(f"Hindi translation error: {str(e)}")
             return f"Error: Translation failed with exception: {str(e)}"
 
-    def process(self, text):
-        """Process Hindi text: translate to English, print translation, and summarize."""
+    def translate_summary(self, summary, target='en'):
+        """Translate a (short) native summary, one request per ~4500 characters."""
+        translator = self.translator_factory(source='hi', target=target)
+        parts = []
+        current = ""
+        for sentence in sentence_split(summary, lang='hi'):
+            if current and len(current) + len(sentence) + 1 > 4500:
+                parts.append(current)
+                current = ""
+            current = f"{current} {sentence}".strip()
+        if current:
+            parts.append(current)
+        tracing.incr('translator_calls', len(parts))
+        with tracing.span('translate'):
+            return " ".join(translator.translate(part) for part in parts)
+
+    def process(self, text, summary_lang='hi', lang=None, profile=DEFAULT_PROFILE):
+        """
+        Process Hindi text: summarize natively with the multilingual model and
+        translate the summary only when another summary language is requested.
+        Without a usable native summary, falls back to translate-then-summarize,
+        which produces an English summary.
+
+        Returns:
+            tuple: (summary or error message, method that produced it, language
+                of the summary); method and language are None on errors.
+        """
         if not text or not isinstance(text, str) or not text.strip():
-            return "Error: Invalid input text"
+            return "Error: Invalid input text", None, None
 
         try:
-            # Verify language
-            lang = detect(text) if text.strip() else 'hi'
+            # Verify language, unless the caller already detected it
+            if lang is None:
+                lang = detect_language(text, default='hi')
             if lang != 'hi':
-                return "Error: Input must be in Hindi"
+                return "Error: Input must be in Hindi", None, None
+
+            if self.summarizer is None or not self.summarizer.supports('hi'):
+                print("Multilingual summarizer unavailable, using translate-then-summarize")
+                return self.process_via_translation(text, profile=profile), 'translate+bart', 'en'
+
+            with tracing.span('native_summarize'):
+                summary = self.summarizer.summarize(text, 'hi', profile=profile)
+            if not summary or len(summary.strip()) < 10:
+                print("Warning: Native summary is too short, using translate-then-summarize")
+                return self.process_via_translation(text, profile=profile), 'translate+bart', 'en'
 
+            if summary_lang and summary_lang != 'hi':
+                method = f"{self.summarizer.method}+translate"
+                return self.translate_summary(summary, target=summary_lang), method, summary_lang
+            return summary, self.summarizer.method, 'hi'
+
+        except Exception as e:
+            print(f"Hindi processing error: {str(e)}")
+            return f"Error: {str(e)}", None, None
+
+    def process_via_translation(self, text, profile=DEFAULT_PROFILE):
+        """Process Hindi text: translate to English and summarize."""
+        try:
             # Translate to English
             translated_text = self.translate_hindi_to_english(text)
             if translated_text.startswith("Error"):
                 return translated_text
 
-            # Print translated text to terminal
-            print("Translated English text:")
-            print(translated_text)
-            print("-" * 50)  # Separator for clarity
-
             # Preprocess translated text to ensure compatibility with EnglishTextProcessor
             # translated_text = translated_text.strip()
             if len(translated_text) < 20:
@@ -95,15 +142,12 @@ class HindiProcessor:
                 translated_text += " This is a summary of the provided Hindi text."
 
             # Pass to EnglishTextProcessor
-            print("Passing translated text to EnglishTextProcessor")
-            summary = self.english_processor.process_text(translated_text, max_tokens=1000)
-            print("Result from English processor:", summary)
+            summary = self.english_processor.process_text(translated_text, profile=profile)
 
             # Check if summary is valid
             if not summary or len(summary.strip()) < 10:
                 print("Warning: Summary is too short, returning translated text as fallback")
                 return translated_text  # Fallback to translated text to avoid error
-            print("Returned summary:", summary)
             return summary
 
         except Exception as e:
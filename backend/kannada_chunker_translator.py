@@ -1,13 +1,12 @@
 import requests
 from langdetect import detect
-from transformers import AutoTokenizer
+from model_store import ensure_nltk, load_tokenizer
 import nltk
-nltk.download('punkt_tab', quiet=True)
-nltk.download('punkt', quiet=True)
+ensure_nltk('punkt_tab', 'punkt')
 
 # Initialize tokenizer for token counting
 try:
-    tokenizer = AutoTokenizer.from_pretrained("facebook/mbart-large-50")
+    tokenizer = load_tokenizer("facebook/mbart-large-50")
 except Exception as e:
     print(f"Error loading tokenizer: {str(e)}")
     tokenizer = None
@@ -1,16 +1,19 @@
-import nltk
-from transformers import AutoTokenizer
+from model_store import ensure_nltk, load_tokenizer
 from deep_translator import GoogleTranslator
 from english_chunker import EnglishTextProcessor
 from indicnlp.tokenize.sentence_tokenize import sentence_split
-from langdetect import detect
-nltk.download('punkt', quiet=True)
-nltk.download('punkt_tab', quiet=True)
+from language_detector import detect_language
+import tracing
+from generation_profiles import DEFAULT_PROFILE
+ensure_nltk('punkt', 'punkt_tab')
 
 class KannadaProcessor:
-    def __init__(self):
-        self.tokenizer = AutoTokenizer.from_pretrained("xlm-roberta-base")
-        self.english_processor = EnglishTextProcessor()
+    def __init__(self, summarizer=None, english_processor=None, translator_factory=GoogleTranslator):
+        self.tokenizer = load_tokenizer("xlm-roberta-base")
+        # Share the heavy models with the other processors when the app passes them in
+        self.english_processor = english_processor or EnglishTextProcessor()
+        self.summarizer = summarizer
+        self.translator_factory = translator_factory
 
     def translate_kannada_to_english(self, text, chunk_size=550):
         """
@@ -28,33 +31,35 @@ class KannadaProcessor:
         if not text or not isinstance(text, str) or not text.strip():
             return "Error: Invalid input text. Please provide a string."
 
-        translator = GoogleTranslator(source='kn', target='en')
+        translator = self.translator_factory(source='kn', target='en')
 
         try:
             # Check the length of the input text in terms of tokens
-            input_tokens = len(self.tokenizer.encode(text, add_special_tokens=False))
-            print(f"Kannada input tokens: {input_tokens}")
+            with tracing.span('tokenize'):
+                input_tokens = len(self.tokenizer.encode(text, add_special_tokens=False))
+            tracing.incr('input_tokens', input_tokens)
 
             if input_tokens <= chunk_size:
                 # If the text is short enough, translate it directly
-                print("Translating Kannada to English (single pass)")
-                translated_text = translator.translate(text)
+                with tracing.span('translate'):
+                    translated_text = translator.translate(text)
+                tracing.incr('translator_calls')
                 if not translated_text or len(translated_text.strip()) < 10:
                     print("Warning: Translated text is too short or empty")
                     return "Error: Translation produced insufficient text."
                 return translated_text
             else:
                 # If the text is too long, split it into sentences and translate each sentence
-                print("Input exceeds 550 tokens, chunking enabled")
                 sentences = sentence_split(text,lang='kn')
                 translated_sentences = []
-                for i, sentence in enumerate(sentences):
-                    print(f"Translating sentence {i+1}/{len(sentences)}")
-                    translated_sentence = translator.translate(sentence)
+                for sentence in sentences:
+                    with tracing.span('translate'):
+                        translated_sentence = translator.translate(sentence)
+                    tracing.incr('translator_calls')
                     if translated_sentence and len(translated_sentence.strip()) >= 5:
                         translated_sentences.append(translated_sentence)
                     else:
-                        print(f"Warning: Translation failed or too short for sentence: {sentence}")
+                        tracing.incr('translation_failures')
                 translated_text = " ".join(translated_sentences)
                 if not translated_text or len(translated_text.strip()) < 20:
                     print("Warning: Combined translated text is too short or empty")
@@ -65,27 +70,70 @@ class KannadaProcessor:
             print(f"Kannada translation error: {str(e)}")
             return f"Error: Translation failed with exception: {str(e)}"
 
-    def process(self, text):
-        """Process Kannada text: translate to English, print translation, and summarize."""
+    def translate_summary(self, summary, target='en'):
+        """Translate a (short) native summary, one request per ~4500 characters."""
+        translator = self.translator_factory(source='kn', target=target)
+        parts = []
+        current = ""
+        for sentence in sentence_split(summary, lang='kn'):
+            if current and len(current) + len(sentence) + 1 > 4500:
+                parts.append(current)
+                current = ""
+            current = f"{current} {sentence}".strip()
+        if current:
+            parts.append(current)
+        tracing.incr('translator_calls', len(parts))
+        with tracing.span('translate'):
+            return " ".join(translator.translate(part) for part in parts)
+
+    def process(self, text, summary_lang='kn', lang=None, profile=DEFAULT_PROFILE):
+        """
+        Process Kannada text: summarize natively with the multilingual model and
+        translate the summary only when another summary language is requested.
+        Without a usable native summary, falls back to translate-then-summarize,
+        which produces an English summary.
+
+        Returns:
+            tuple: (summary or error message, method that produced it, language
+                of the summary); method and language are None on errors.
+        """
         if not text or not isinstance(text, str) or not text.strip():
-            return "Error: Invalid input text"
+            return "Error: Invalid input text", None, None
 
         try:
-            # Verify language
-            lang = detect(text) if text.strip() else 'kn'
+            # Verify language, unless the caller already detected it
+            if lang is None:
+                lang = detect_language(text, default='kn')
             if lang != 'kn':
-                return "Error: Input must be in Kannada"
+                return "Error: Input must be in Kannada", None, None
+
+            if self.summarizer is None or not self.summarizer.supports('kn'):
+                print("Multilingual summarizer does not cover Kannada, using translate-then-summarize")
+                return self.process_via_translation(text, profile=profile), 'translate+bart', 'en'
+
+            with tracing.span('native_summarize'):
+                summary = self.summarizer.summarize(text, 'kn', profile=profile)
+            if not summary or len(summary.strip()) < 10:
+                print("Warning: Native summary is too short, using translate-then-summarize")
+                return self.process_via_translation(text, profile=profile), 'translate+bart', 'en'
+
+            if summary_lang and summary_lang != 'kn':
+                method = f"{self.summarizer.method}+translate"
+                return self.translate_summary(summary, target=summary_lang), method, summary_lang
+            return summary, self.summarizer.method, 'kn'
 
+        except Exception as e:
+            print(f"Kannada processing error: {str(e)}")
+            return f"Error: {str(e)}", None, None
+
+    def process_via_translation(self, text, profile=DEFAULT_PROFILE):
+        """Process Kannada text: translate to English and summarize."""
+        try:
             # Translate to English
             translated_text = self.translate_kannada_to_english(text)
             if translated_text.startswith("Error"):
                 return translated_text
 
-            # Print translated text to terminal
-            print("Translated English text:")
-            print(translated_text)
-            print("-" * 50)  # Separator for clarity
-
             # Preprocess translated text to ensure compatibility with EnglishTextProcessor
             translated_text = translated_text.strip()
             if len(translated_text) < 20:
@@ -93,15 +141,12 @@ class KannadaProcessor:
                 translated_text += " This is a summary of the provided Kannada text."
 
             # Pass to EnglishTextProcessor
-            print("Passing translated text to EnglishTextProcessor")
-            summary = self.english_processor.process_text(translated_text, max_tokens=1000)
-            print("result from english processor:", summary)
+            summary = self.english_processor.process_text(translated_text, profile=profile)
             
             # Check if summary is valid
             if not summary or len(summary.strip()) < 10:
                 print("Warning: Summary is too short, returning translated text as fallback")
                 return translated_text  # Fallback to translated text to avoid error
-            print("returned summary:", summary)
             return summary
 
         except Exception as e:
@@ -0,0 +1,67 @@
+import numpy as np
+from langdetect import detect, LangDetectException
+
+# Unicode blocks for the scripts we support
+DEVANAGARI_RANGE = (0x0900, 0x097F)
+KANNADA_RANGE = (0x0C80, 0x0CFF)
+LATIN_RANGES = ((0x0041, 0x005A), (0x0061, 0x007A), (0x00C0, 0x024F))
+
+# Share of letters a script needs before we trust the histogram alone
+DOMINANCE_THRESHOLD = 0.6
+# Characters scanned by the histogram and handed to langdetect on ambiguous input
+HISTOGRAM_SAMPLE_CHARS = 200000
+LANGDETECT_SAMPLE_CHARS = 2000
+
+
+def script_histogram(text, sample_chars=HISTOGRAM_SAMPLE_CHARS):
+    """
+    Count Devanagari, Kannada and Latin letters in text using a single
+    vectorized pass over its code points.
+
+    Args:
+        text (str): Text to inspect.
+        sample_chars (int, optional): Only the first sample_chars characters are
+            scanned. Defaults to HISTOGRAM_SAMPLE_CHARS.
+
+    Returns:
+        dict: Letter counts keyed by 'hi', 'kn' and 'en'.
+    """
+    codes = np.frombuffer(text[:sample_chars].encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    latin = np.zeros(codes.shape, dtype=bool)
+    for low, high in LATIN_RANGES:
+        latin |= (codes >= low) & (codes <= high)
+    return {
+        'hi': int(np.count_nonzero((codes >= DEVANAGARI_RANGE[0]) & (codes <= DEVANAGARI_RANGE[1]))),
+        'kn': int(np.count_nonzero((codes >= KANNADA_RANGE[0]) & (codes <= KANNADA_RANGE[1]))),
+        'en': int(np.count_nonzero(latin))
+    }
+
+
+def detect_language(text, default='en'):
+    """
+    Identify the language of text, preferring the script histogram and only
+    running langdetect on a bounded sample when no script clearly dominates.
+
+    Args:
+        text (str): Text to identify.
+        default (str, optional): Language returned for empty or undetectable
+            input. Defaults to 'en'.
+
+    Returns:
+        str: ISO 639-1 language code.
+    """
+    if not text or not text.strip():
+        return default
+
+    counts = script_histogram(text)
+    total = sum(counts.values())
+    if total:
+        lang, count = max(counts.items(), key=lambda item: item[1])
+        # Latin-script text is summarized as English whatever its language
+        if count / total >= DOMINANCE_THRESHOLD:
+            return lang
+
+    try:
+        return detect(text[:LANGDETECT_SAMPLE_CHARS])
+    except LangDetectException:
+        return default
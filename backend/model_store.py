@@ -0,0 +1,297 @@
+"""
+Local store of the models the backend loads, saved once as safetensors.
+
+Usage:
+    python model_store.py download [repo_id ...] [--force]
+    python model_store.py list
+
+With no repo ids, `download` fetches every model in MODELS. It always
+fetches the NLTK data in NLTK_RESOURCES too. The app loads stored models
+from disk without network access; weights are memory-mapped, so worker
+processes share one copy in the page cache.
+"""
+import argparse
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+import time
+from itertools import chain
+import nltk
+import torch
+from transformers import AutoConfig, AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+MODEL_DIR = os.environ.get("MODEL_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+# Refuse to fall back to the Hugging Face hub for models missing from the store
+OFFLINE = os.environ.get("MODEL_STORE_OFFLINE", "0") == "1"
+STORE_MANIFEST = "store.json"
+NLTK_DIR = os.path.join(MODEL_DIR, "nltk_data")
+# NLTK packages the backend uses, with the path nltk.data.find() looks them up by
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords'
+}
+if NLTK_DIR not in nltk.data.path:
+    nltk.data.path.insert(0, NLTK_DIR)
+
+# Everything the backend loads. 'tokenizer' entries only need their vocabulary.
+MODELS = {
+    "facebook/bart-large-cnn": {'kind': 'seq2seq'},
+    "ai4bharat/IndicBART-XLSum": {
+        'kind': 'seq2seq',
+        'tokenizer_kwargs': {'do_lower_case': False, 'use_fast': False, 'keep_accents': True}
+    },
+    "xlm-roberta-base": {'kind': 'tokenizer'},
+    "facebook/mbart-large-50": {'kind': 'tokenizer'}
+}
+
+SAFETENSORS_DTYPES = {
+    'F64': torch.float64,
+    'F32': torch.float32,
+    'F16': torch.float16,
+    'BF16': torch.bfloat16,
+    'I64': torch.int64,
+    'I32': torch.int32,
+    'I16': torch.int16,
+    'I8': torch.int8,
+    'U8': torch.uint8,
+    'BOOL': torch.bool
+}
+
+
+def local_path(repo_id):
+    """Store directory for a model; the last part of the hub name, as download_model.py used."""
+    return os.path.join(MODEL_DIR, repo_id.rstrip('/').split('/')[-1])
+
+
+def is_stored(repo_id):
+    return os.path.exists(os.path.join(local_path(repo_id), STORE_MANIFEST))
+
+
+def resolve(repo_id):
+    """
+    Find where to load a model from.
+
+    Returns:
+        tuple: (path or hub name, whether it is on local disk).
+
+    Raises:
+        FileNotFoundError: If the model is not stored and MODEL_STORE_OFFLINE=1.
+    """
+    if os.path.isdir(repo_id):
+        return repo_id, True
+    if is_stored(repo_id):
+        return local_path(repo_id), True
+    if OFFLINE:
+        raise FileNotFoundError(
+            f"{repo_id} is not in the model store; run: python model_store.py download {repo_id}"
+        )
+    print(f"{repo_id} is not in the model store, loading from the hub")
+    return repo_id, False
+
+
+def ensure_nltk(*names):
+    """
+    Make NLTK packages available, downloading only those that neither the
+    store nor the system NLTK data directories already have.
+    """
+    for name in names:
+        try:
+            nltk.data.find(NLTK_RESOURCES[name])
+        except LookupError:
+            if OFFLINE:
+                print(f"NLTK package {name} is not in the model store; run: python model_store.py download")
+                continue
+            nltk.download(name, quiet=True)
+
+
+def download_nltk():
+    for name in NLTK_RESOURCES:
+        nltk.download(name, download_dir=NLTK_DIR, quiet=True)
+    print(f"NLTK data saved to {NLTK_DIR}")
+
+
+def load_tokenizer(repo_id, **kwargs):
+    path, stored = resolve(repo_id)
+    return AutoTokenizer.from_pretrained(path, local_files_only=stored, **kwargs)
+
+
+def _weight_files(path):
+    index = os.path.join(path, "model.safetensors.index.json")
+    if os.path.exists(index):
+        with open(index) as f:
+            files = sorted(set(json.load(f)['weight_map'].values()))
+        return [os.path.join(path, name) for name in files]
+    single = os.path.join(path, "model.safetensors")
+    return [single] if os.path.exists(single) else []
+
+
+def mmap_safetensors(path):
+    """
+    Tensors of a safetensors file as views into a copy-on-write memory map.
+
+    Nothing is read up front: pages are faulted in on first use and stay
+    shared with every other process mapping the same file.
+
+    Returns:
+        dict: Tensor name to tensor.
+    """
+    with open(path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    data_start = 8 + header_size
+
+    tensors = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        dtype = SAFETENSORS_DTYPES[info['dtype']]
+        count = math.prod(info['shape'])
+        if count == 0:
+            tensors[name] = torch.empty(info['shape'], dtype=dtype)
+            continue
+        begin = data_start + info['data_offsets'][0]
+        tensors[name] = torch.frombuffer(mapped, dtype=dtype, count=count, offset=begin).reshape(info['shape'])
+    return tensors
+
+
+def _load_mapped(path):
+    """Build the model without allocating weights and point its parameters at the mapped files."""
+    files = _weight_files(path)
+    if not files:
+        return None
+    config = AutoConfig.from_pretrained(path, local_files_only=True)
+    with torch.device('meta'):
+        model = AutoModelForSeq2SeqLM.from_config(config)
+
+    state = {}
+    for file in files:
+        state.update(mmap_safetensors(file))
+    # Tied weights (shared embeddings, lm_head) are saved once and re-tied below
+    model.load_state_dict(state, strict=False, assign=True)
+    model.tie_weights()
+
+    if any(t.is_meta for t in chain(model.parameters(), model.buffers())):
+        return None
+    return model
+
+
+def load_seq2seq(repo_id):
+    """
+    Load a sequence-to-sequence model in eval mode, on the CPU.
+
+    Stored models are memory-mapped from their safetensors files when the
+    checkpoint covers every parameter and buffer, and otherwise loaded
+    normally from the store. Callers move the model to their device.
+    """
+    path, stored = resolve(repo_id)
+    model = None
+    if stored:
+        try:
+            model = _load_mapped(path)
+        except Exception as e:
+            print(f"Memory-mapped loading failed for {repo_id}: {str(e)}")
+        if model is None:
+            print(f"Loading {repo_id} from {path} without memory mapping")
+            model = AutoModelForSeq2SeqLM.from_pretrained(path, local_files_only=True, low_cpu_mem_usage=True)
+    else:
+        model = AutoModelForSeq2SeqLM.from_pretrained(path)
+    return model.eval()
+
+
+def summarization_pipeline(repo_id):
+    """Summarization pipeline over a stored model and its tokenizer."""
+    return pipeline(
+        "summarization",
+        model=load_seq2seq(repo_id),
+        tokenizer=load_tokenizer(repo_id),
+        device=0 if torch.cuda.is_available() else -1
+    )
+
+
+def download(repo_id, force=False):
+    """
+    Download a model from the hub and save it to the store as safetensors.
+
+    Args:
+        repo_id (str): Hugging Face model name.
+        force (bool, optional): Replace a model that is already stored.
+            Defaults to False.
+
+    Returns:
+        str: The model's store directory.
+    """
+    path = local_path(repo_id)
+    if is_stored(repo_id) and not force:
+        print(f"{repo_id} already stored at {path}")
+        return path
+
+    spec = MODELS.get(repo_id, {'kind': 'seq2seq'})
+    partial = path + ".partial"
+    shutil.rmtree(partial, ignore_errors=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(repo_id, **spec.get('tokenizer_kwargs', {}))
+    tokenizer.save_pretrained(partial)
+    if spec['kind'] == 'seq2seq':
+        model = AutoModelForSeq2SeqLM.from_pretrained(repo_id)
+        model.save_pretrained(partial, safe_serialization=True)
+    with open(os.path.join(partial, STORE_MANIFEST), 'w') as f:
+        json.dump({'repo_id': repo_id, 'kind': spec['kind'], 'saved': time.time()}, f)
+
+    # Swap in the finished directory so an interrupted download never looks stored
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(partial, path)
+    print(f"{repo_id} saved to {path}")
+    return path
+
+
+def stored_models():
+    """Manifest and on-disk size of every stored model."""
+    models = []
+    if not os.path.isdir(MODEL_DIR):
+        return models
+    for name in sorted(os.listdir(MODEL_DIR)):
+        manifest_path = os.path.join(MODEL_DIR, name, STORE_MANIFEST)
+        if not os.path.exists(manifest_path):
+            continue
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        size = sum(
+            os.path.getsize(os.path.join(root, file))
+            for root, _, files in os.walk(os.path.join(MODEL_DIR, name))
+            for file in files
+        )
+        models.append(dict(manifest, path=os.path.join(MODEL_DIR, name), size_bytes=size))
+    return models
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    download_parser = commands.add_parser('download', help="Download models into the store")
+    download_parser.add_argument('repo_ids', nargs='*', default=list(MODELS))
+    download_parser.add_argument('--force', action='store_true', help="Replace models already stored")
+    commands.add_parser('list', help="Show stored models")
+    args = parser.parse_args()
+
+    if args.command == 'download':
+        for repo_id in args.repo_ids:
+            download(repo_id, force=args.force)
+        download_nltk()
+        return 0
+
+    models = stored_models()
+    if not models:
+        print(f"No models stored in {MODEL_DIR}")
+    for model in models:
+        print(f"{model['repo_id']:<32}{model['kind']:<12}{model['size_bytes'] / (1024 * 1024):>10.1f} MB  {model['path']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import os
+import torch
+from model_store import load_tokenizer, load_seq2seq
+from indicnlp.tokenize.sentence_tokenize import sentence_split
+from indicnlp.transliterate.unicode_transliterate import UnicodeIndicTransliterator
+import tracing
+from generation_profiles import DEFAULT_PROFILE, generation_kwargs
+from chunk_planner import ChunkPlanner
+from admission import estimate_tokens
+
+# IndicBART fine-tuned for summarization on XL-Sum; the pretrained IndicBART is
+# a denoising model and mostly reproduces its input. mBART-50 has no Kannada
+# vocabulary. Override with MULTILINGUAL_SUMMARY_MODEL to use another checkpoint.
+DEFAULT_MODEL = os.environ.get("MULTILINGUAL_SUMMARY_MODEL", "ai4bharat/IndicBART-XLSum")
+
+# Language tags used by IndicBART-style models ("<2hi>") and mBART-50 codes ("hi_IN")
+INDICBART_TAGS = {'hi': '<2hi>', 'kn': '<2kn>', 'en': '<2en>'}
+MBART_CODES = {'hi': 'hi_IN', 'en': 'en_XX'}
+# Languages a fine-tuned checkpoint was trained on. XL-Sum has no Kannada, so
+# Kannada goes through translation with the default model. Checkpoints not
+# listed here are assumed to cover every language they have a tag for.
+CHECKPOINT_LANGUAGES = {
+    "ai4bharat/IndicBART-XLSum": {'hi'}
+}
+# Checkpoints that read and write every Indic language in Devanagari
+SCRIPT_UNIFIED_MODELS = {"ai4bharat/IndicBART"}
+DEVANAGARI_LANGUAGES = {'hi', 'en'}
+
+
+def _known_checkpoint(model_name, known):
+    """Match a checkpoint by hub name, or by the directory name of a stored copy."""
+    if model_name in known:
+        return model_name
+    name = model_name.rstrip('/').split('/')[-1]
+    return next((repo_id for repo_id in known if repo_id.split('/')[-1] == name), None)
+
+
+class MultilingualSummarizer:
+    def __init__(self, model_name=DEFAULT_MODEL, batch_size=4):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.tokenizer = load_tokenizer(
+            model_name, do_lower_case=False, use_fast=False, keep_accents=True
+        )
+        self.model = load_seq2seq(model_name).to(self.device)
+        self.is_mbart = hasattr(self.tokenizer, 'lang_code_to_id')
+        self.method = 'mbart' if self.is_mbart else 'indicbart'
+        self.languages = CHECKPOINT_LANGUAGES.get(_known_checkpoint(model_name, CHECKPOINT_LANGUAGES))
+        self.script_unified = _known_checkpoint(model_name, SCRIPT_UNIFIED_MODELS) is not None
+        # Chunk and batch sizes from the calibrated cost model, else 550 tokens in batches of batch_size
+        self.planner = ChunkPlanner(model_name, default_chunk_tokens=550, default_batch_size=batch_size)
+
+    def supports(self, lang):
+        """Check whether the loaded checkpoint was trained on `lang` and has a tag for it."""
+        if self.languages is not None and lang not in self.languages:
+            return False
+        if self.is_mbart:
+            return lang in MBART_CODES
+        return lang in INDICBART_TAGS
+
+    def to_model_script(self, text, lang):
+        """Transliterate text into Devanagari for script-unified checkpoints; others read it as is."""
+        if not self.script_unified or lang in DEVANAGARI_LANGUAGES:
+            return text
+        return UnicodeIndicTransliterator.transliterate(text, lang, 'hi')
+
+    def from_model_script(self, text, lang):
+        """Transliterate model output back into the language's own script."""
+        if not self.script_unified or lang in DEVANAGARI_LANGUAGES:
+            return text
+        return UnicodeIndicTransliterator.transliterate(text, 'hi', lang)
+
+    def count_tokens(self, text):
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def chunk_text(self, text, lang, chunk_size=550):
+        """
+        Split text into sentence-aligned chunks of at most chunk_size tokens.
+        Text is expected in the model's script (see to_model_script).
+
+        Returns:
+            tuple: (list of chunks, list of their token counts).
+        """
+        sentences = sentence_split(text, lang=lang)
+        chunks = []
+        counts = []
+        current_chunk = []
+        current_tokens = 0
+
+        for sentence in sentences:
+            sent_tokens = self.count_tokens(sentence)
+            if current_tokens + sent_tokens > chunk_size and current_chunk:
+                chunks.append(" ".join(current_chunk))
+                counts.append(current_tokens)
+                current_chunk = []
+                current_tokens = 0
+            current_chunk.append(sentence)
+            current_tokens += sent_tokens
+
+        if current_chunk:
+            chunks.append(" ".join(current_chunk))
+            counts.append(current_tokens)
+        return chunks, counts
+
+    def _encode(self, chunks, lang, max_input_length):
+        if self.is_mbart:
+            self.tokenizer.src_lang = MBART_CODES[lang]
+            return self.tokenizer(
+                chunks,
+                max_length=max_input_length,
+                truncation=True,
+                padding=True,
+                return_tensors="pt"
+            )
+        # IndicBART expects "sentence </s> <2xx>" as the source format
+        tagged = [f"{chunk} </s> {INDICBART_TAGS[lang]}" for chunk in chunks]
+        return self.tokenizer(
+            tagged,
+            max_length=max_input_length,
+            truncation=True,
+            padding=True,
+            add_special_tokens=False,
+            return_tensors="pt"
+        )
+
+    def _decoder_start_id(self, lang):
+        if self.is_mbart:
+            return self.tokenizer.lang_code_to_id[MBART_CODES[lang]]
+        return self.tokenizer.convert_tokens_to_ids(INDICBART_TAGS[lang])
+
+    def summarize_batch(self, chunks, lang, counts, profile=DEFAULT_PROFILE, max_input_length=1024,
+                        batch_size=None):
+        """
+        Summarize a list of chunks in batches, keeping the source language.
+        Length limits come from the profile, scaled to the batch's chunk sizes.
+        Batches hold batch_size chunks, or self.batch_size when not given.
+        Chunks and summaries are in the model's script (see to_model_script).
+        """
+        summaries = []
+        start_id = self._decoder_start_id(lang)
+        single_pass = len(chunks) == 1
+        batch_size = batch_size or self.batch_size
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i + batch_size]
+            batch_counts = counts[i:i + batch_size]
+            # The longest chunk sets the length cap, the shortest the minimum
+            kwargs = generation_kwargs(profile, max(batch_counts), single_pass=single_pass)
+            shortest = generation_kwargs(profile, min(batch_counts), single_pass=single_pass)
+            kwargs['min_length'] = shortest['min_length']
+            inputs = self._encode(batch, lang, max_input_length).to(self.device)
+            inputs.pop('token_type_ids', None)
+            tracing.incr('input_tokens', int(inputs['attention_mask'].sum()))
+            with torch.no_grad():
+                output_ids = self.model.generate(
+                    **inputs,
+                    **kwargs,
+                    decoder_start_token_id=start_id,
+                    forced_bos_token_id=start_id if self.is_mbart else None
+                )
+            tracing.incr('decode_steps', output_ids.shape[1] - 1)
+            summaries.extend(
+                self.tokenizer.batch_decode(
+                    output_ids,
+                    skip_special_tokens=True,
+                    clean_up_tokenization_spaces=False
+                )
+            )
+        return [s.strip() for s in summaries]
+
+    def summarize(self, text, lang, chunk_size=None, profile=DEFAULT_PROFILE):
+        """
+        Summarize Hindi or Kannada text directly, without translating it first.
+
+        Args:
+            text (str): Text in the source language.
+            lang (str): ISO code of the source language ('hi' or 'kn').
+            chunk_size (int, optional): Maximum number of tokens per chunk.
+                Defaults to the planner's choice for the text's length.
+            profile (str, optional): Generation profile name. Defaults to
+                DEFAULT_PROFILE.
+
+        Returns:
+            str: Summary in the source language.
+        """
+        if not self.supports(lang):
+            raise ValueError(f"Model {self.model_name} does not support language: {lang}")
+
+        text = self.to_model_script(text, lang)
+        if chunk_size:
+            batch_size = self.batch_size
+        else:
+            chunk_size, batch_size = self.planner.plan(estimate_tokens(text, self.tokenizer))
+        with tracing.span('chunking'):
+            chunks, counts = self.chunk_text(text, lang, chunk_size=chunk_size)
+        tracing.incr('chunks', len(chunks))
+        tracing.set_attr('chunk_tokens', chunk_size)
+        tracing.set_attr('batch_size', batch_size)
+        if not chunks:
+            return ""
+
+        with tracing.span('generate'):
+            summaries = self.summarize_batch(chunks, lang, counts, profile=profile, batch_size=batch_size)
+        return self.from_model_script(" ".join(s for s in summaries if s), lang)
@@ -0,0 +1,205 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+FONT_DIR = os.path.dirname(os.path.abspath(__file__))
+FONT_MAPPING = {
+    'en': 'NotoSans',
+    'hi': 'NotoSansDevanagari',
+    'kn': 'NotoSansKannada'
+}
+
+PAGE_WIDTH, PAGE_HEIGHT = letter
+MARGIN = 72
+LINE_HEIGHT = 14
+BODY_FONT_SIZE = 12
+MAX_LINE_WIDTH = PAGE_WIDTH - 2 * MARGIN
+
+
+def register_fonts():
+    """Register the bundled Noto fonts with reportlab."""
+    try:
+        font_path = os.path.join(FONT_DIR, 'NotoSans-Regular.ttf')
+        if os.path.exists(font_path):
+            pdfmetrics.registerFont(TTFont('NotoSans', font_path))
+
+        font_path = os.path.join(FONT_DIR, 'NotoSans-Devanagari-Regular.ttf')
+        if os.path.exists(font_path):
+            pdfmetrics.registerFont(TTFont('NotoSansDevanagari', font_path))
+
+        font_path = os.path.join(FONT_DIR, 'NotoSans-Kannada-Regular.ttf')
+        if os.path.exists(font_path):
+            pdfmetrics.registerFont(TTFont('NotoSansKannada', font_path))
+    except Exception as e:
+        print(f"Font registration error: {str(e)}")
+        pdfmetrics.registerFont(TTFont('NotoSans', 'Helvetica'))
+        pdfmetrics.registerFont(TTFont('NotoSansDevanagari', 'Helvetica'))
+        pdfmetrics.registerFont(TTFont('NotoSansKannada', 'Helvetica'))
+
+
+class SummaryPdfRenderer:
+    """
+    Renders summaries to PDF, reusing font metrics, line layouts and whole
+    rendered documents across requests.
+
+    Word widths are cached per font, so wrapping a paragraph costs one dict
+    lookup per word after the first time a word is seen. Rendered PDFs are
+    memoized by (summary hash, language, method) in an LRU bounded by size.
+    """
+    def __init__(self, max_cache_bytes=64 * 1024 * 1024, max_words_per_font=200000):
+        self.max_cache_bytes = max_cache_bytes
+        self.max_words_per_font = max_words_per_font
+        self.registered_fonts = set(pdfmetrics.getRegisteredFontNames())
+        self._space_widths = {}
+        self._word_widths = {}
+        self._pdf_cache = OrderedDict()
+        self._pdf_cache_bytes = 0
+        self._lock = threading.Lock()
+
+    def resolve_font(self, lang):
+        font = FONT_MAPPING.get(lang, 'NotoSans')
+        return font if font in self.registered_fonts else 'Helvetica'
+
+    def _widths(self, font):
+        widths = self._word_widths.get(font)
+        if widths is None or len(widths) > self.max_words_per_font:
+            widths = self._word_widths[font] = {}
+            self._space_widths[font] = pdfmetrics.stringWidth(' ', font, 1)
+        return widths
+
+    def wrap(self, paragraph, font, font_size=BODY_FONT_SIZE, max_width=MAX_LINE_WIDTH):
+        """Greedy word wrap with the same line breaks as reportlab's simpleSplit."""
+        widths = self._widths(font)
+        space = self._space_widths[font] * font_size
+        lines = []
+        current = []
+        width = -space
+        for word in paragraph.split():
+            word_width = widths.get(word)
+            if word_width is None:
+                word_width = widths[word] = pdfmetrics.stringWidth(word, font, 1)
+            word_width *= font_size
+            if width + space + word_width <= max_width or not current:
+                current.append(word)
+                width += space + word_width
+            else:
+                lines.append(' '.join(current))
+                current = [word]
+                width = word_width
+        if current:
+            lines.append(' '.join(current))
+        return lines
+
+    def _draw_summary(self, c, summary, method, lang, language_name, title="Document Summary"):
+        y_position = PAGE_HEIGHT - MARGIN
+        font = self.resolve_font(lang)
+
+        c.setFont('Helvetica', 16)
+        c.drawCentredString(PAGE_WIDTH / 2, y_position, title)
+        y_position -= 30
+
+        c.setFont('Helvetica', 12)
+        c.drawCentredString(PAGE_WIDTH / 2, y_position, f"Method: {method.upper()} | Language: {language_name}")
+        y_position -= 30
+
+        c.setFont(font, BODY_FONT_SIZE)
+        for paragraph in summary.split('\n'):
+            for line in self.wrap(paragraph, font):
+                if y_position < MARGIN:
+                    c.showPage()
+                    c.setFont(font, BODY_FONT_SIZE)
+                    y_position = PAGE_HEIGHT - MARGIN
+                c.drawString(MARGIN, y_position, line)
+                y_position -= LINE_HEIGHT
+            y_position -= LINE_HEIGHT
+        c.showPage()
+
+    @staticmethod
+    def cache_key(summary, lang, method):
+        return (hashlib.sha256(summary.encode('utf-8')).hexdigest(), lang, method)
+
+    def _cache_get(self, key):
+        with self._lock:
+            pdf = self._pdf_cache.get(key)
+            if pdf is not None:
+                self._pdf_cache.move_to_end(key)
+            return pdf
+
+    def _cache_put(self, key, pdf):
+        if len(pdf) > self.max_cache_bytes:
+            return
+        with self._lock:
+            if key in self._pdf_cache:
+                return
+            self._pdf_cache[key] = pdf
+            self._pdf_cache_bytes += len(pdf)
+            while self._pdf_cache_bytes > self.max_cache_bytes:
+                _, evicted = self._pdf_cache.popitem(last=False)
+                self._pdf_cache_bytes -= len(evicted)
+
+    def render(self, summary, method, lang, language_name, use_cache=True):
+        """
+        Render one summary.
+
+        Args:
+            summary (str): Summary text; newlines separate paragraphs.
+            method (str): Summarization method shown in the header.
+            lang (str): Language code used to pick the font.
+            language_name (str): Language name shown in the header.
+            use_cache (bool, optional): Reuse and store the rendered PDF.
+                Defaults to True.
+
+        Returns:
+            tuple: (PDF bytes, whether it came from the cache).
+        """
+        key = self.cache_key(summary, lang, method)
+        if use_cache:
+            pdf = self._cache_get(key)
+            if pdf is not None:
+                return pdf, True
+
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=letter)
+        self._draw_summary(c, summary, method, lang, language_name)
+        c.save()
+        pdf = buffer.getvalue()
+
+        if use_cache:
+            self._cache_put(key, pdf)
+        return pdf, False
+
+    def render_batch(self, sections):
+        """
+        Render many summaries into one PDF, one section per summary, each
+        starting on a new page and listed in the document outline.
+
+        Args:
+            sections (list): Dicts with 'summary', 'method', 'language' and
+                'language_name' keys, and an optional 'title'.
+
+        Returns:
+            bytes: The combined PDF.
+        """
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=letter)
+        for i, section in enumerate(sections):
+            title = section.get('title') or f"Summary {i + 1}"
+            bookmark = f"section-{i + 1}"
+            c.bookmarkPage(bookmark)
+            c.addOutlineEntry(title, bookmark, level=0)
+            self._draw_summary(
+                c,
+                section['summary'],
+                section.get('method', ''),
+                section.get('language', 'en'),
+                section.get('language_name', 'Unknown'),
+                title=title
+            )
+        c.save()
+        return buffer.getvalue()
@@ -0,0 +1,289 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from PyPDF2 import PdfReader
+from text_normalizer import clean_pdf_pages
+from dedup import remove_boilerplate_lines
+
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "summarizer_uploads"))
+# Largest part accepted in one request; must stay under Flask's MAX_CONTENT_LENGTH
+MAX_PART_BYTES = 8 * 1024 * 1024
+# Largest assembled upload
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 1024 * 1024 * 1024))
+# Uploads untouched for this long are removed when new ones are created
+STALE_UPLOAD_SECONDS = 24 * 60 * 60
+COPY_BLOCK_BYTES = 1024 * 1024
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# Extracted text of a completed upload, kept so /summarize can read it by upload id
+EXTRACTED_TEXT = 'extracted.txt'
+
+
+class UploadError(Exception):
+    """Raised for invalid upload requests; carries the HTTP status to return."""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def extract_pdf(path, fallback_title):
+    """
+    Extract cleaned text and metadata from a PDF on disk, page by page.
+    Lines repeated across most pages (running headers, footers, page stamps)
+    are dropped before cleaning.
+
+    Returns:
+        tuple: (text, metadata dict with 'pages', 'author', 'title' and
+            'boilerplate_lines').
+    """
+    # Given a path, PdfReader reads the whole file into memory; a handle is read on demand
+    with open(path, 'rb') as f:
+        reader = PdfReader(f)
+        metadata = {
+            'pages': len(reader.pages),
+            'author': reader.metadata.author if reader.metadata and reader.metadata.author else 'Unknown',
+            'title': reader.metadata.title if reader.metadata and reader.metadata.title else fallback_title
+        }
+        pages, metadata['boilerplate_lines'] = remove_boilerplate_lines(
+            [page.extract_text() for page in reader.pages]
+        )
+    text = clean_pdf_pages(pages)
+    return text, metadata
+
+
+def has_pdf_header(path):
+    with open(path, 'rb') as f:
+        return f.read(5) == b'%PDF-'
+
+
+def is_standalone_pdf(path):
+    """Whether a file starts with a PDF header and ends with an end-of-file marker."""
+    if not has_pdf_header(path):
+        return False
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - 1024))
+        return b'%%EOF' in f.read()
+
+
+class UploadStore:
+    """
+    Chunked, resumable uploads written straight to disk.
+
+    Each upload lives in its own directory with one file per part and a
+    manifest of received parts and their SHA-256 digests. A client can ask
+    which parts arrived and resend only the missing ones. Parts that are
+    complete PDFs on their own (a report bundle sent one document per part)
+    are extracted in the background as soon as they arrive, so extraction
+    overlaps with the rest of the upload.
+    """
+    def __init__(self, root=UPLOAD_DIR, max_workers=2):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._extractions = {}
+
+    def _upload_dir(self, upload_id):
+        if not UPLOAD_ID_PATTERN.match(upload_id or ''):
+            raise UploadError('Invalid upload id', 404)
+        path = os.path.join(self.root, upload_id)
+        if not os.path.isdir(path):
+            raise UploadError('Unknown upload id', 404)
+        return path
+
+    def _manifest_path(self, upload_id):
+        return os.path.join(self._upload_dir(upload_id), 'manifest.json')
+
+    def _read_manifest(self, upload_id):
+        with open(self._manifest_path(upload_id)) as f:
+            return json.load(f)
+
+    def _write_manifest(self, upload_id, manifest):
+        path = self._manifest_path(upload_id)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(path + '.tmp', path)
+
+    def _drop_extractions(self, upload_id):
+        """Cancel and forget background extractions of an upload's parts."""
+        with self._lock:
+            for key in [key for key in self._extractions if key[0] == upload_id]:
+                self._extractions.pop(key).cancel()
+
+    def _remove_stale(self):
+        cutoff = time.time() - STALE_UPLOAD_SECONDS
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if UPLOAD_ID_PATTERN.match(name) and os.path.getmtime(path) < cutoff:
+                self._drop_extractions(name)
+                shutil.rmtree(path, ignore_errors=True)
+
+    def create(self, filename):
+        self._remove_stale()
+        upload_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.root, upload_id))
+        self._write_manifest(upload_id, {'filename': filename, 'parts': {}, 'created': time.time()})
+        return upload_id
+
+    def status(self, upload_id):
+        manifest = self._read_manifest(upload_id)
+        parts = sorted(int(index) for index in manifest['parts'])
+        return {
+            'upload_id': upload_id,
+            'filename': manifest['filename'],
+            'received_parts': parts,
+            'received_bytes': sum(part['size'] for part in manifest['parts'].values())
+        }
+
+    def write_part(self, upload_id, index, stream, expected_sha256):
+        """
+        Stream one part to disk and verify its digest.
+
+        Args:
+            upload_id (str): Id returned by create().
+            index (int): 1-based part number.
+            stream: File-like request body.
+            expected_sha256 (str): Hex SHA-256 the client computed for the part.
+
+        Returns:
+            dict: The part's index, size and digest.
+
+        Raises:
+            UploadError: If the part is too large or its digest does not match.
+        """
+        upload_dir = self._upload_dir(upload_id)
+        if index < 1:
+            raise UploadError('Part numbers start at 1')
+        if not expected_sha256:
+            raise UploadError('Missing X-Content-SHA256 header')
+
+        part_path = os.path.join(upload_dir, f'part-{index:06d}')
+        tmp_path = part_path + '.tmp'
+        digest = hashlib.sha256()
+        size = 0
+        with open(tmp_path, 'wb') as f:
+            while True:
+                block = stream.read(COPY_BLOCK_BYTES)
+                if not block:
+                    break
+                size += len(block)
+                if size > MAX_PART_BYTES:
+                    f.close()
+                    os.unlink(tmp_path)
+                    raise UploadError(f'Part exceeds {MAX_PART_BYTES} bytes', 413)
+                digest.update(block)
+                f.write(block)
+
+        if digest.hexdigest() != expected_sha256.lower():
+            os.unlink(tmp_path)
+            raise UploadError('Part checksum mismatch')
+
+        with self._lock:
+            manifest = self._read_manifest(upload_id)
+            manifest['parts'][str(index)] = {'size': size, 'sha256': expected_sha256.lower()}
+            # Check before replacing, so a rejected resend leaves the stored part intact
+            if sum(part['size'] for part in manifest['parts'].values()) > MAX_UPLOAD_BYTES:
+                os.unlink(tmp_path)
+                raise UploadError(f'Upload exceeds {MAX_UPLOAD_BYTES} bytes', 413)
+            os.replace(tmp_path, part_path)
+            self._write_manifest(upload_id, manifest)
+
+            # Start extracting standalone documents while later parts upload
+            if is_standalone_pdf(part_path):
+                self._extractions[(upload_id, index)] = self._executor.submit(
+                    extract_pdf, part_path, manifest['filename']
+                )
+            else:
+                self._extractions.pop((upload_id, index), None)
+        return {'index': index, 'size': size, 'sha256': expected_sha256.lower()}
+
+    def complete(self, upload_id, total_parts):
+        """
+        Finish an upload and return its extracted text and metadata.
+
+        If any part was detected as a standalone PDF, every part is treated as
+        its own document: parts without a background extraction are submitted
+        now, and the results are joined in part order. A bundle that mixes
+        PDFs with parts lacking a PDF header is rejected, since concatenating
+        separate PDFs would keep only the last one. Otherwise the parts are
+        byte ranges of one PDF; they are concatenated on disk, block by block,
+        and the assembled PDF is extracted page by page. The text replaces the
+        uploaded files on disk, for extracted_text().
+        """
+        upload_dir = self._upload_dir(upload_id)
+        if os.path.exists(os.path.join(upload_dir, EXTRACTED_TEXT)):
+            raise UploadError('Upload already completed', 409)
+        manifest = self._read_manifest(upload_id)
+        missing = [i for i in range(1, total_parts + 1) if str(i) not in manifest['parts']]
+        if missing:
+            raise UploadError(f'Missing parts: {missing}', 409)
+
+        with self._lock:
+            futures = [self._extractions.pop((upload_id, i), None) for i in range(1, total_parts + 1)]
+
+        if any(futures):
+            for i, future in enumerate(futures, start=1):
+                if future is not None:
+                    continue
+                part_path = os.path.join(upload_dir, f'part-{i:06d}')
+                if not has_pdf_header(part_path):
+                    for pending in futures:
+                        if pending is not None:
+                            pending.cancel()
+                    raise UploadError(f'Part {i} is not a PDF, but other parts are complete PDFs', 400)
+                futures[i - 1] = self._executor.submit(extract_pdf, part_path, manifest['filename'])
+
+            texts = []
+            metadata = {'pages': 0, 'author': 'Unknown', 'title': manifest['filename'],
+                        'documents': total_parts, 'boilerplate_lines': 0}
+            for future in futures:
+                text, part_metadata = future.result()
+                texts.append(text)
+                metadata['pages'] += part_metadata['pages']
+                metadata['boilerplate_lines'] += part_metadata['boilerplate_lines']
+            return self._keep_text(upload_dir, ' '.join(t for t in texts if t)), metadata
+
+        assembled = os.path.join(upload_dir, 'assembled.pdf')
+        with open(assembled, 'wb') as out:
+            for i in range(1, total_parts + 1):
+                with open(os.path.join(upload_dir, f'part-{i:06d}'), 'rb') as part:
+                    shutil.copyfileobj(part, out, COPY_BLOCK_BYTES)
+        text, metadata = extract_pdf(assembled, manifest['filename'])
+        return self._keep_text(upload_dir, text), metadata
+
+    def _keep_text(self, upload_dir, text):
+        """Store the extracted text in place of the uploaded files."""
+        with open(os.path.join(upload_dir, EXTRACTED_TEXT), 'w', encoding='utf-8') as f:
+            f.write(text)
+        for name in os.listdir(upload_dir):
+            if name.startswith('part-') or name == 'assembled.pdf':
+                os.unlink(os.path.join(upload_dir, name))
+        return text
+
+    def extracted_text(self, upload_id):
+        """
+        Text extracted by complete(). It stays available until the upload is
+        deleted or goes stale, so text too large to post back can be
+        summarized by upload id.
+
+        Raises:
+            UploadError: If the upload is unknown or not completed yet.
+        """
+        path = os.path.join(self._upload_dir(upload_id), EXTRACTED_TEXT)
+        if not os.path.exists(path):
+            raise UploadError('Upload is not completed', 409)
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def delete(self, upload_id):
+        upload_dir = self._upload_dir(upload_id)
+        self._drop_extractions(upload_id)
+        shutil.rmtree(upload_dir, ignore_errors=True)
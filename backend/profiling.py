@@ -0,0 +1,211 @@
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+import torch
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "summarizer_profiles"))
+# Requests carrying this value in X-Profile-Token are profiled; unset disables the header
+PROFILE_TOKEN = os.environ.get("PROFILE_ADMIN_TOKEN", "")
+# Share of requests to the profiled endpoints that are profiled without asking
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+# Also record torch operator timings
+PROFILE_TORCH = os.environ.get("PROFILE_TORCH", "1") == "1"
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+# Oldest profiles are removed beyond this many
+MAX_PROFILES = 200
+PROFILED_ENDPOINTS = {'summarize', 'process_pdf', 'translate', 'tts'}
+PROFILE_ID_PATTERN = re.compile(r'^[0-9]{8}T[0-9]{6}-[a-z_]+-[0-9A-Za-z_-]{1,64}-[0-9a-f]{8}$')
+
+# The torch profiler is process-wide, so only one request records ops at a time
+_torch_lock = threading.Lock()
+
+
+def is_admin_token(token):
+    """Whether token is the admin token, compared in constant time."""
+    if not PROFILE_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode('utf-8'), PROFILE_TOKEN.encode('utf-8'))
+
+
+def should_profile(endpoint, token):
+    """Whether a request is profiled: an admin token, else the sampling rate."""
+    if endpoint not in PROFILED_ENDPOINTS:
+        return None
+    if is_admin_token(token):
+        return 'header'
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return 'sampled'
+    return None
+
+
+def _frame_name(frame):
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+class RequestProfiler:
+    """
+    Profiles one request while its handler runs.
+
+    A sidecar thread samples the request thread's Python stack every
+    SAMPLE_INTERVAL seconds and counts identical stacks, giving collapsed
+    stacks that flamegraph.pl, speedscope or inferno render directly.
+    Sampling costs the request thread nothing beyond the GIL switches, unlike
+    cProfile's per-call hooks. When PROFILE_TORCH is on and no other request
+    holds the torch profiler, operator timings are recorded as well.
+    """
+    def __init__(self, endpoint, request_id, trigger, interval=SAMPLE_INTERVAL):
+        self.endpoint = endpoint
+        self.request_id = request_id
+        self.trigger = trigger
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._torch_profiler = None
+        self._started = None
+        self._stopped = False
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._started = time.time()
+        if PROFILE_TORCH and _torch_lock.acquire(blocking=False):
+            try:
+                activities = [torch.profiler.ProfilerActivity.CPU]
+                if torch.cuda.is_available():
+                    activities.append(torch.profiler.ProfilerActivity.CUDA)
+                self._torch_profiler = torch.profiler.profile(activities=activities)
+                self._torch_profiler.__enter__()
+            except Exception as e:
+                print(f"Torch profiler unavailable: {str(e)}")
+                self._torch_profiler = None
+                _torch_lock.release()
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and return the torch operator table, if one was recorded."""
+        if self._stopped:
+            return None
+        self._stopped = True
+        self._stop.set()
+        self._sampler.join()
+        if self._torch_profiler is None:
+            return None
+        try:
+            self._torch_profiler.__exit__(None, None, None)
+            sort_by = 'self_cuda_time_total' if torch.cuda.is_available() else 'self_cpu_time_total'
+            return self._torch_profiler.key_averages().table(sort_by=sort_by, row_limit=50)
+        except Exception as e:
+            print(f"Torch profiler failed: {str(e)}")
+            return None
+        finally:
+            self._torch_profiler = None
+            _torch_lock.release()
+
+    def save(self, status, directory=PROFILE_DIR):
+        """
+        Stop profiling and write the artifacts.
+
+        Files are <profile_id>.folded (collapsed stacks), <profile_id>.torch.txt
+        (operator table, when recorded) and <profile_id>.json (metadata).
+
+        Returns:
+            dict: The metadata written.
+        """
+        duration = time.time() - self._started
+        torch_table = self.stop()
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime(self._started))
+        request_id = re.sub(r'[^0-9A-Za-z_-]', '_', self.request_id)[:64]
+        # Clients choose X-Request-ID, so a server suffix keeps reused ids from overwriting
+        profile_id = f"{stamp}-{self.endpoint}-{request_id}-{uuid.uuid4().hex[:8]}"
+
+        files = {'folded': f"{profile_id}.folded"}
+        with open(os.path.join(directory, files['folded']), 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        if torch_table:
+            files['torch'] = f"{profile_id}.torch.txt"
+            with open(os.path.join(directory, files['torch']), 'w') as f:
+                f.write(torch_table)
+
+        metadata = {
+            'profile_id': profile_id,
+            'request_id': self.request_id,
+            'endpoint': self.endpoint,
+            'status': status,
+            'trigger': self.trigger,
+            'started': self._started,
+            'duration_ms': round(duration * 1000, 2),
+            'samples': sum(self.stacks.values()),
+            'interval_ms': self.interval * 1000,
+            'files': files
+        }
+        with open(os.path.join(directory, f"{profile_id}.json"), 'w') as f:
+            json.dump(metadata, f)
+        prune_profiles(directory)
+        return metadata
+
+
+def start_profile(endpoint, token, request_id):
+    """Start profiling the current request if it qualifies; returns the profiler or None."""
+    trigger = should_profile(endpoint, token)
+    if trigger is None:
+        return None
+    return RequestProfiler(endpoint, request_id, trigger).start()
+
+
+def list_profiles(directory=PROFILE_DIR):
+    """Metadata of saved profiles, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    profiles.sort(key=lambda p: p.get('started', 0), reverse=True)
+    return profiles
+
+
+def profile_file(profile_id, kind, directory=PROFILE_DIR):
+    """Path of a saved artifact ('folded' or 'torch'), or None if there is none."""
+    if not PROFILE_ID_PATTERN.match(profile_id or ''):
+        return None
+    suffix = {'folded': '.folded', 'torch': '.torch.txt'}.get(kind)
+    if suffix is None:
+        return None
+    path = os.path.join(directory, profile_id + suffix)
+    return path if os.path.exists(path) else None
+
+
+def prune_profiles(directory=PROFILE_DIR, keep=MAX_PROFILES):
+    for metadata in list_profiles(directory)[keep:]:
+        for name in list(metadata.get('files', {}).values()) + [f"{metadata['profile_id']}.json"]:
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
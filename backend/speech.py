@@ -0,0 +1,31 @@
+import io
+from gtts import gTTS
+from pydub import AudioSegment
+
+
+def gtts_synthesizer(text, lang):
+    """Synthesize speech with Google TTS; returns (audio bytes, format)."""
+    tts = gTTS(text=text, lang=lang, slow=False)
+    mp3_fp = io.BytesIO()
+    tts.write_to_fp(mp3_fp)
+    return mp3_fp.getvalue(), "mp3"
+
+
+def synthesize_wav(text, lang, synthesizer=gtts_synthesizer):
+    """
+    Synthesize text and convert the audio to WAV.
+
+    Args:
+        text (str): Text to speak.
+        lang (str): Language code understood by the synthesizer.
+        synthesizer (callable, optional): Function taking (text, lang) and
+            returning (audio bytes, format). Defaults to gtts_synthesizer.
+
+    Returns:
+        bytes: WAV audio.
+    """
+    audio_bytes, audio_format = synthesizer(text, lang)
+    audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format=audio_format)
+    wav_fp = io.BytesIO()
+    audio.export(wav_fp, format="wav")
+    return wav_fp.getvalue()
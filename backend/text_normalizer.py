@@ -0,0 +1,72 @@
+import re
+
+# Word/Office markup left behind by PDF text extraction, matched in one pass.
+# The shared literal "<" prefix lets the regex engine skip ahead between tags.
+# Conditional comments and <xml> islands may span lines; namespaced tags may not.
+PDF_MARKUP_PATTERN = re.compile(
+    r'<(?:'
+    r'(?s:!\[if.*?\]>)'
+    r'|/?[a-zA-Z]:.*?>'
+    r'|(?s:xml>.*?</xml>)'
+    r')'
+)
+
+# Artifacts the summarizer copies from the source: runs of "ii" and CP page stamps
+REPEATED_I_PATTERN = re.compile(r'ii+')
+CP_STAMP_PATTERN = re.compile(r'“CP\d+” — \d{4}/\d{1,2}/\d{1,2} — \d{1,2}:\d{2} — page \d+ — #\d+')
+
+# After whitespace is collapsed a sentence break is always punctuation plus one space
+SENTENCE_BREAKS = (('. ', '.\n\n'), ('! ', '!\n\n'), ('? ', '?\n\n'))
+
+# Characters outside the summary's script are dropped for Kannada and Hindi
+SCRIPT_FILTER_PATTERNS = {
+    'kn': re.compile(r'[^\u0C80-\u0CFF\s.!?]'),
+    'hi': re.compile(r'[^\u0900-\u097F\s.!?]')
+}
+
+
+def clean_pdf_text(text):
+    """Strip extraction markup and collapse all whitespace to single spaces."""
+    if '<' in text:
+        text = PDF_MARKUP_PATTERN.sub('', text)
+    return ' '.join(text.split())
+
+
+def iter_clean_pages(pages):
+    """
+    Clean extracted PDF text one page at a time.
+
+    Args:
+        pages (iterable): Raw text of each page, as returned by
+            PdfReader.pages[i].extract_text(). None entries are skipped.
+
+    Yields:
+        str: Cleaned text of each page that is not empty after cleaning.
+            Markup that spans a page break is not removed.
+    """
+    for page in pages:
+        if not page:
+            continue
+        cleaned = clean_pdf_text(page)
+        if cleaned:
+            yield cleaned
+
+
+def clean_pdf_pages(pages):
+    """Clean page texts and join them the way clean_pdf_text joins a whole document."""
+    return ' '.join(iter_clean_pages(pages))
+
+
+def clean_summary_text(text, lang='en'):
+    """Remove summarizer artifacts and format the summary for its language."""
+    if 'ii' in text:
+        text = REPEATED_I_PATTERN.sub('', text)
+    if '“CP' in text:
+        text = CP_STAMP_PATTERN.sub('', text)
+    text = ' '.join(text.split())
+    if lang == 'en':
+        for old, new in SENTENCE_BREAKS:
+            text = text.replace(old, new)
+    elif lang in SCRIPT_FILTER_PATTERNS:
+        text = SCRIPT_FILTER_PATTERNS[lang].sub('', text)
+    return text.strip()
@@ -0,0 +1,183 @@
+import contextvars
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Upper bounds in seconds; summarization stages range from milliseconds to minutes
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# Upper bounds for per-request token and chunk counts
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000, 100000)
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram, keyed by label values."""
+    def __init__(self, name, help_text, label_names=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.setdefault(label_values, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _labels(self, label_values, extra=None):
+        pairs = list(zip(self.label_names, label_values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (bucket_counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    lines.append(f"{self.name}_bucket{self._labels(label_values, ('le', bound))} {bucket_count}")
+                lines.append(f"{self.name}_bucket{self._labels(label_values, ('le', '+Inf'))} {count}")
+                lines.append(f"{self.name}_sum{self._labels(label_values)} {total}")
+                lines.append(f"{self.name}_count{self._labels(label_values)} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic Prometheus-style counter, keyed by label values."""
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value, *label_values):
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._series.items()):
+                labels = ','.join(f'{k}="{v}"' for k, v in zip(self.label_names, label_values))
+                lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    'summarizer_request_seconds', 'End-to-end request latency.', ('endpoint', 'status'))
+STAGE_SECONDS = Histogram(
+    'summarizer_stage_seconds', 'Time spent per pipeline stage within a request.', ('endpoint', 'stage'))
+REQUEST_COUNTS = Histogram(
+    'summarizer_request_count_value', 'Per-request counts such as tokens, chunks and translator calls.',
+    ('endpoint', 'counter'), buckets=COUNT_BUCKETS)
+EVENTS_TOTAL = Counter(
+    'summarizer_events_total', 'Counts accumulated across all requests.', ('endpoint', 'counter'))
+
+METRICS = [REQUEST_SECONDS, STAGE_SECONDS, REQUEST_COUNTS, EVENTS_TOTAL]
+
+
+class Trace:
+    """Stage durations and counters collected while serving one request."""
+    def __init__(self, endpoint, request_id=None):
+        self.endpoint = endpoint
+        self.request_id = request_id or uuid.uuid4().hex
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        # Per-request values such as chosen settings; logged but not aggregated
+        self.attributes = {}
+
+    def add_stage(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def incr(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_attr(self, name, value):
+        self.attributes[name] = value
+
+    def finish(self, status):
+        """Record the trace into the metrics and return it as a log record."""
+        duration = time.perf_counter() - self.start
+        REQUEST_SECONDS.observe(duration, self.endpoint, str(status))
+        for name, seconds in self.stages.items():
+            STAGE_SECONDS.observe(seconds, self.endpoint, name)
+        for name, value in self.counters.items():
+            REQUEST_COUNTS.observe(value, self.endpoint, name)
+            EVENTS_TOTAL.inc(value, self.endpoint, name)
+        return {
+            'request_id': self.request_id,
+            'endpoint': self.endpoint,
+            'status': status,
+            'duration_ms': round(duration * 1000, 2),
+            'stages_ms': {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()},
+            'counters': self.counters,
+            'attributes': self.attributes
+        }
+
+    def server_timing(self):
+        """Stage durations formatted for the Server-Timing response header."""
+        return ', '.join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items())
+
+
+def start_trace(endpoint, request_id=None):
+    trace = Trace(endpoint, request_id)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name):
+    """Time a stage of the current request; a no-op outside a traced request."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_stage(name, time.perf_counter() - start)
+
+
+def incr(name, value=1):
+    """Add to a counter of the current request; a no-op outside a traced request."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.incr(name, value)
+
+
+def set_attr(name, value):
+    """Set an attribute of the current request; a no-op outside a traced request."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.set_attr(name, value)
+
+
+def log_trace(record):
+    print(json.dumps(record, ensure_ascii=False), flush=True)
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'